@@ -0,0 +1,62 @@
+import os
+import threading
+import pygame
+from settings import DIALOG_DIR
+
+
+class SoundBank:
+    # Decoded dialog and SFX clips by file name. preload() decodes clips on a background thread;
+    # play() never touches the disk, so it is safe to call mid-frame. A clip asked for before it
+    # has finished decoding plays as soon as it is ready.
+    def __init__(self, directory=DIALOG_DIR):
+        self.directory = directory
+        self._sounds = {}
+        self._failed = set()
+        self._queued = set()
+        self._pending = set()  # played before they were decoded
+        self._lock = threading.Lock()
+
+    def preload(self, names):
+        if not pygame.mixer.get_init():
+            return
+        with self._lock:
+            names = [n for n in names if n not in self._queued]
+            self._queued.update(names)
+        if names:
+            threading.Thread(target=self._load, args=(names,), daemon=True).start()
+
+    def _load(self, names):
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, OSError) as e:
+                print("Failed to load sound", path, e)
+                with self._lock:
+                    self._failed.add(name)
+                    self._pending.discard(name)
+                continue
+            with self._lock:
+                self._sounds[name] = sound
+                play_now = name in self._pending
+                self._pending.discard(name)
+            if play_now:
+                sound.play()
+
+    def ready(self, name):
+        return name in self._sounds
+
+    def play(self, name):
+        # Plays a clip without blocking: now if it is decoded, otherwise once it is.
+        with self._lock:
+            sound = self._sounds.get(name)
+            if sound is None:
+                if name in self._failed:
+                    return
+                self._pending.add(name)
+                needs_load = name not in self._queued
+        if sound is None:
+            if needs_load:
+                self.preload([name])
+            return
+        sound.play()
@@ -0,0 +1,116 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from entities import PlayerInput, NO_INPUT
+from settings import PIXELS_PER_METER
+from utils import percentile
+from simulation import Simulation
+from chunks import ChunkCache
+
+HISTOGRAM_BUCKET_M = 100
+
+
+def load_trace(path):
+    # One line per tick naming the keys held on that tick, e.g. "d space" or "a k".
+    # Blank lines are ticks with nothing held.
+    inputs = []
+    with open(path, "r") as f:
+        for line in f:
+            keys = line.split()
+            inputs.append(PlayerInput("a" in keys, "d" in keys, "space" in keys, "k" in keys))
+    return inputs
+
+
+def run_climb(task):
+    # Runs in a worker process: one headless climb from start to death or max_steps.
+    seed, special_mode, max_steps, trace, use_chunks = task
+    chunks = ChunkCache() if use_chunks else None
+    sim = Simulation(special_mode=special_mode, is_bot=trace is None, seed=seed, chunks=chunks)
+    start = time.perf_counter()
+    while not sim.dead and sim.steps < max_steps:
+        if trace is None:
+            sim.step()
+        else:
+            sim.step(trace[sim.steps] if sim.steps < len(trace) else NO_INPUT)
+    elapsed = time.perf_counter() - start
+    return {
+        "seed": seed,
+        "special_mode": special_mode,
+        "died": sim.dead,
+        "height": (sim.start_y - sim.max_height) / PIXELS_PER_METER,
+        "steps": sim.steps,
+        "seconds": elapsed,
+        "encounters": dict(sim.platform_encounters),
+    }
+
+
+def summarize(results):
+    heights = sorted(r["height"] for r in results)
+    deaths = sorted(r["height"] for r in results if r["died"])
+    encounters = Counter()
+    for r in results:
+        encounters.update(r["encounters"])
+    histogram = Counter(int(h // HISTOGRAM_BUCKET_M) * HISTOGRAM_BUCKET_M for h in deaths)
+    total_steps = sum(r["steps"] for r in results)
+    total_seconds = sum(r["seconds"] for r in results)
+    rates = sorted(r["steps"] / r["seconds"] for r in results if r["seconds"] > 0)
+    return {
+        "runs": len(results),
+        "deaths": len(deaths),
+        "height_m": {p: percentile(heights, p) for p in (10, 25, 50, 75, 90, 99)} | {"max": heights[-1] if heights else 0.0},
+        "death_height_histogram_m": dict(sorted(histogram.items())),
+        "platform_encounters": dict(encounters.most_common()),
+        "total_steps": total_steps,
+        "steps_per_second": {
+            "aggregate": total_steps / total_seconds if total_seconds else 0.0,
+            "p50": percentile(rates, 50),
+            "min": rates[0] if rates else 0.0,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless climbs in parallel and report statistics.")
+    parser.add_argument("--runs", type=int, default=1000, help="climbs per mode")
+    parser.add_argument("--mode", choices=["normal", "harder", "both"], default="normal")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first climb; climb i uses seed + i")
+    parser.add_argument("--max-steps", type=int, default=60 * 60 * 10, help="step limit per climb (default 10 min)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--trace", help="play this input trace instead of the bot policy")
+    parser.add_argument("--chunks", action="store_true", help="load towers from the on-disk chunk cache")
+    parser.add_argument("--json", help="also write the summary and per-run results to this file")
+    args = parser.parse_args(argv)
+
+    trace = load_trace(args.trace) if args.trace else None
+    modes = {"normal": [False], "harder": [True], "both": [False, True]}[args.mode]
+    summary = {}
+    all_results = []
+    for special_mode in modes:
+        tasks = [(args.seed + i, special_mode, args.max_steps, trace, args.chunks) for i in range(args.runs)]
+        workers = args.workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 8))
+        wall_start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_climb, tasks, chunksize=chunksize))
+        wall = time.perf_counter() - wall_start
+        name = "harder" if special_mode else "normal"
+        summary[name] = summarize(results)
+        summary[name]["wall_seconds"] = wall
+        all_results.extend(results)
+        print(f"== {name}: {len(results)} climbs in {wall:.1f}s")
+        print(json.dumps(summary[name], indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"summary": summary, "runs": all_results}, f)
+
+
+if __name__ == "__main__":
+    main()
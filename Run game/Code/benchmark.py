@@ -0,0 +1,270 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, SPRITES_DIR, BENCHMARK_BASELINE
+from entities import Player, SPRITE_FILES, SPRITE_FRAME_COUNTS
+from clock import VirtualClock
+from world import Tower
+from chunks import ChunkCache
+from simulation import Simulation, START_Y, SPAWN_POS
+from sprite_cache import load_frames
+from render import platform_atlas, GameplayRenderer
+from leaderboard import Leaderboard, MODES
+
+# Every benchmark is a setup function returning (run, ops) or (run, ops, reset): run() is timed
+# `repeat` times and results are reported per op, so sizes can change without invalidating old
+# baselines. reset(), if given, runs untimed after each run().
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+# Benchmark towers are seeded, so after the first run they load from the chunk cache.
+chunk_cache = ChunkCache()
+
+
+def tall_tower(count, seed=0, clock=None):
+    tower = Tower(START_Y, seed=seed, clock=clock or VirtualClock(), chunks=chunk_cache)
+    for _ in range(count):
+        tower.add_platform(tower.next_platform())
+    tower.highest_platform_y = tower.top_platform.rect.y
+    return tower
+
+
+@benchmark
+def tower_generate(n=5000):
+    # Tower.generate_next_platform throughput.
+    tower = Tower(START_Y, seed=0, clock=VirtualClock())
+
+    def run():
+        for _ in range(n):
+            tower.add_platform(tower.next_platform())
+    return run, n
+
+
+@benchmark
+def tower_chunk_load(n=5000):
+    # The same platforms read back from chunk files on disk (a cold ChunkCache each run).
+    tall_tower(n)  # make sure the chunks exist
+
+    def run():
+        tower = Tower(START_Y, seed=0, clock=VirtualClock(), chunks=ChunkCache())
+        for _ in range(n):
+            tower.add_platform(tower.next_platform())
+    return run, n
+
+
+@benchmark
+def tower_update(n=5000):
+    # Tower.update with n live platforms, none of them culled.
+    tower = tall_tower(n)
+    top = tower.top_platform.rect.y
+
+    def run():
+        # A camera above the whole tower would generate more; one at the bottom culls nothing.
+        tower.update(START_Y - SCREEN_HEIGHT)
+        tower.highest_platform_y = top
+    return run, 1
+
+
+@benchmark
+def player_collision(n=5000, steps=600):
+    # Player.update (bot policy, gravity, collision) standing on a tower of n platforms.
+    clock = VirtualClock()
+    tower = tall_tower(n, clock=clock)
+    player = Player(*SPAWN_POS, is_bot=True, headless=True, clock=clock, seed=0)
+
+    def run():
+        for _ in range(steps):
+            clock.advance()
+            player.update(tower)
+    return run, steps
+
+
+def _renderer():
+    return GameplayRenderer(pygame.display.get_surface(), pygame.font.SysFont(None, 36))
+
+
+def _gameplay_sim(steps=600):
+    sim = Simulation(headless=False, seed=0, is_bot=True)
+    for _ in range(steps):
+        sim.step()
+    return sim
+
+
+@benchmark
+def platform_draw():
+    # Platform.draw for every platform in view of a climb in progress.
+    renderer = _renderer()
+    sim = _gameplay_sim()
+    platforms = list(sim.tower.platforms)
+    camera_offset_y = sim.camera_offset_y
+
+    def run():
+        for plat in platforms:
+            plat.draw(renderer.screen, renderer.font, camera_offset_y)
+    return run, 1
+
+
+@benchmark
+def platform_atlas_draw():
+    # The same platforms through render.platform_atlas, as the gameplay loop draws them.
+    renderer = _renderer()
+    sim = _gameplay_sim()
+    platforms = list(sim.tower.platforms)
+    camera_offset_y = sim.camera_offset_y
+
+    def run():
+        platform_atlas.draw(renderer.screen, platforms, renderer.font, camera_offset_y)
+    return run, 1
+
+
+@benchmark
+def full_frame():
+    # GameplayRenderer.draw plus display.flip, as in one gameplay frame.
+    renderer = _renderer()
+    sim = _gameplay_sim()
+
+    def run():
+        for _ in range(60):
+            renderer.draw(sim)
+            pygame.display.flip()
+    return run, 60
+
+
+def _sprite_paths():
+    return {state: os.path.join(SPRITES_DIR, filename) for state, filename in SPRITE_FILES.items()}
+
+
+@benchmark
+def sprite_build():
+    # Player._build_sprite_frames: decode, slice and scale every sheet (a cold start).
+    player = Player(*SPAWN_POS, headless=True)
+    return player._build_sprite_frames, 1
+
+
+@benchmark
+def sprite_cache_load():
+    # Player frames read back from the on-disk sprite atlas (a warm start).
+    player = Player(*SPAWN_POS, headless=True)
+    directory = tempfile.mkdtemp(prefix="climb_bench_")
+    size = (player.sprite_draw_width, player.sprite_draw_height)
+    paths = _sprite_paths()
+    load_frames(paths, SPRITE_FRAME_COUNTS, size, player._build_sprite_frames, directory)
+
+    def run():
+        load_frames(paths, SPRITE_FRAME_COUNTS, size, player._build_sprite_frames, directory)
+    return run, 1
+
+
+@benchmark
+def leaderboard_submit(rounds=100):
+    # Leaderboard.submit as called at game over: the heap update only, the write is queued.
+    board = Leaderboard(os.path.join(tempfile.mkdtemp(prefix="climb_bench_"), "leaderboard.log"))
+    rng = random.Random(0)
+
+    def run():
+        for _ in range(rounds):
+            board.submit(rng.uniform(0, 5000), rng.choice(MODES), rng.getrandbits(63), 60.0)
+    # Drain the write queue between repeats, outside the timing; it is not part of the game-over cost.
+    return run, rounds, board.flush
+
+
+@benchmark
+def leaderboard_load(history=10000):
+    # Startup load of a leaderboard log holding `history` climbs.
+    path = os.path.join(tempfile.mkdtemp(prefix="climb_bench_"), "leaderboard.log")
+    board = Leaderboard(path, compact_after=history + 1)
+    rng = random.Random(0)
+    for _ in range(history):
+        board.submit(rng.uniform(0, 5000), rng.choice(MODES), rng.getrandbits(63), 60.0)
+    board.flush()
+
+    def run():
+        Leaderboard(path).load()
+    return run, 1
+
+
+def measure(name, repeat):
+    run, ops, *hooks = BENCHMARKS[name]()
+    reset = hooks[0] if hooks else (lambda: None)
+    run()  # warm-up: caches, lazy imports, first-touch allocation
+    reset()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+        reset()
+    per_op = sorted(t / ops * 1e6 for t in times)
+    return {"ops": ops, "repeat": repeat, "median_us": statistics.median(per_op), "best_us": per_op[0]}
+
+
+def compare(results, baseline, threshold):
+    # (name, baseline us, current us, ratio, regressed) for every benchmark in both runs.
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result["median_us"] / base["median_us"] if base["median_us"] else 1.0
+        rows.append((name, base["median_us"], result["median_us"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the game's hot paths headlessly.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--save", nargs="?", const=BENCHMARK_BASELINE, help="write the results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=BENCHMARK_BASELINE, help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fractional slowdown in median time that counts as a regression")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {}
+    for name in names:
+        results[name] = measure(name, args.repeat)
+        print(f"{name:<20} {results[name]['median_us']:12.1f} us/op  (best {results[name]['best_us']:.1f})")
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["benchmarks"]
+        print(f"\nvs {args.compare} (regression > {args.threshold:.0%}):")
+        for name, base_us, cur_us, ratio, slow in compare(results, baseline, args.threshold):
+            print(f"{name:<20} {base_us:12.1f} -> {cur_us:12.1f} us/op  x{ratio:.2f}{'  REGRESSION' if slow else ''}")
+            regressed = regressed or slow
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "pygame": pygame.version.ver,
+                       "machine": platform.platform(), "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "benchmarks": results}, f, indent=2)
+        print(f"\nWrote baseline {args.save}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import mmap
+import os
+import struct
+from settings import PIXELS_PER_METER, CHUNK_CACHE_DIR
+from entities import PTYPE_CODES
+from world import Tower
+from utils import atomic_write
+
+CHUNK_HEIGHT_M = 100
+CHUNK_HEIGHT = CHUNK_HEIGHT_M * PIXELS_PER_METER
+# Bump whenever Tower.generate_next_platform changes so stale chunk files are not reused.
+GENERATOR_VERSION = 1
+
+# File: header (magic, version, record count) followed by fixed-size records of
+# (x, height above the ground in px, width, height, ptype code).
+HEADER = struct.Struct("<4sHI")
+RECORD = struct.Struct("<hiHHB")
+MAGIC = b"TWRC"
+
+
+def generate_chunks(seed, special_mode, count):
+    # The first `count` chunks of a seeded tower, each a list of records. Platforms come out of
+    # a real Tower in generation order, so a chunked tower matches a generated one exactly.
+    tower = Tower(0, special_mode=special_mode, seed=seed)
+    pending = list(tower.platforms)[1:]  # everything generated so far, minus the ground
+    chunk = []
+    index = 0
+    while True:
+        if pending:
+            plat = pending.pop(0)
+        else:
+            # Only the top platform matters for generation, so skip storing the rest.
+            plat = tower.next_platform()
+            tower.top_platform = plat
+        dy = -plat.rect.y
+        while dy >= (index + 1) * CHUNK_HEIGHT:
+            yield chunk
+            chunk = []
+            index += 1
+            if index == count:
+                return
+        chunk.append((plat.rect.x, dy, plat.rect.width, plat.rect.height, PTYPE_CODES[plat.ptype]))
+
+
+class ChunkCache:
+    # Tower chunks on disk keyed by (seed, mode, chunk index), one small binary file per chunk,
+    # read back through mmap. Missing chunks are generated in bulk and written out.
+    def __init__(self, directory=CHUNK_CACHE_DIR, batch=8):
+        self.directory = directory
+        self.batch = batch  # minimum chunks generated past the requested one on a miss
+        self._loaded = {}
+
+    def path(self, seed, special_mode, index):
+        mode = "harder" if special_mode else "normal"
+        return os.path.join(self.directory, f"v{GENERATOR_VERSION}_{mode}_{seed}_{index:05d}.chunk")
+
+    def get(self, seed, special_mode, index):
+        key = (seed, special_mode, index)
+        records = self._loaded.get(key)
+        if records is None:
+            path = self.path(seed, special_mode, index)
+            if os.path.exists(path):
+                records = self._read(path)
+                self._loaded[key] = records
+            else:
+                # Generation always restarts from chunk 0, so grow geometrically.
+                self.build(seed, special_mode, 2 * index + self.batch)
+                records = self._loaded[key]
+        return records
+
+    def build(self, seed, special_mode, count):
+        os.makedirs(self.directory, exist_ok=True)
+        for index, records in enumerate(generate_chunks(seed, special_mode, count)):
+            path = self.path(seed, special_mode, index)
+            if not os.path.exists(path):
+                self._write(path, records)
+            self._loaded[(seed, special_mode, index)] = records
+
+    def iter_records(self, seed, special_mode):
+        index = 0
+        while True:
+            yield from self.get(seed, special_mode, index)
+            index += 1
+
+    def _write(self, path, records):
+        buf = bytearray(HEADER.size + RECORD.size * len(records))
+        HEADER.pack_into(buf, 0, MAGIC, GENERATOR_VERSION, len(records))
+        for i, record in enumerate(records):
+            RECORD.pack_into(buf, HEADER.size + i * RECORD.size, *record)
+        atomic_write(path, bytes(buf))
+
+    def _read(self, path):
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, count = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != GENERATOR_VERSION:
+                raise ValueError(f"not a v{GENERATOR_VERSION} tower chunk: {path}")
+            end = HEADER.size + count * RECORD.size
+            return list(RECORD.iter_unpack(mm[HEADER.size:end]))
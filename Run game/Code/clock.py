@@ -0,0 +1,30 @@
+import pygame
+from settings import FPS
+
+# Milliseconds covered by one fixed simulation step.
+STEP_MS = 1000 / FPS
+
+
+class RealClock:
+    # Wall-clock time, as used by the interactive menu and anything not driven by a Simulation.
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    def advance(self, ms=STEP_MS):
+        # Wall time moves on its own.
+        pass
+
+
+class VirtualClock:
+    # Time that only moves when advanced, so a headless run can go as fast as the CPU allows.
+    def __init__(self, start_ms=0):
+        self.ms = start_ms
+
+    def get_ticks(self):
+        return int(self.ms)
+
+    def advance(self, ms=STEP_MS):
+        self.ms += ms
+
+
+REAL_CLOCK = RealClock()
@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right, insort
+from settings import collectible_defs
+from entities import Collectible
+
+# Height (px) of one bucket of the vertical index.
+ROW_HEIGHT = 128
+
+
+class CollectibleManager:
+    # Spawned collectibles bucketed by row (rect.y // ROW_HEIGHT), with the occupied rows kept
+    # in a sorted list. Collectibles never move, so an overlap query only bisects to the rows
+    # around the rect, and removal swaps the last item of a row into the gap.
+    def __init__(self):
+        self._rows = {}
+        self._row_keys = []
+        self._count = 0
+        self._max_size = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for key in self._row_keys:
+            yield from self._rows[key]
+
+    def spawn(self, index, x, y, size):
+        # Adds collectible_defs[index] at (x, y) and returns it.
+        name, color = collectible_defs[index]
+        item = Collectible(x, y, size, name, color, index=index)
+        key = y // ROW_HEIGHT
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = []
+            insort(self._row_keys, key)
+        item.slot = len(row)
+        row.append(item)
+        self._count += 1
+        self._max_size = max(self._max_size, size)
+        return item
+
+    def remove(self, item):
+        key = item.rect.y // ROW_HEIGHT
+        row = self._rows[key]
+        last = row.pop()
+        if last is not item:
+            row[item.slot] = last
+            last.slot = item.slot
+        if not row:
+            del self._rows[key]
+            del self._row_keys[bisect_left(self._row_keys, key)]
+        self._count -= 1
+
+    def in_band(self, y0, y1):
+        # Collectibles whose rect overlaps the rows y0 <= y < y1.
+        keys = self._row_keys
+        start = bisect_left(keys, (y0 - self._max_size) // ROW_HEIGHT)
+        end = bisect_right(keys, (y1 - 1) // ROW_HEIGHT)
+        return [item for key in keys[start:end] for item in self._rows[key]
+                if item.rect.top < y1 and item.rect.bottom > y0]
+
+    def overlapping(self, rect):
+        return [item for item in self.in_band(rect.top, rect.bottom) if item.rect.colliderect(rect)]
+
+    def cull(self, max_y):
+        # Drops every collectible whose top is below max_y (further down the tower).
+        keys = self._row_keys
+        while keys and keys[-1] * ROW_HEIGHT > max_y:
+            self._count -= len(self._rows.pop(keys.pop()))
+        if keys:
+            # The lowest remaining row may straddle max_y.
+            row = self._rows[keys[-1]]
+            kept = [item for item in row if item.rect.y <= max_y]
+            if len(kept) < len(row):
+                self._count -= len(row) - len(kept)
+                if kept:
+                    for slot, item in enumerate(kept):
+                        item.slot = slot
+                    self._rows[keys[-1]] = kept
+                else:
+                    del self._rows[keys.pop()]
@@ -1,7 +1,11 @@
 import os
 import pygame
 import random
-from settings import SCREEN_WIDTH, WHITE, GRAY, YELLOW, BLACK, SPRITES_DIR
+from collections import namedtuple
+from settings import SCREEN_WIDTH, WHITE, BLACK, SPRITES_DIR
+from clock import REAL_CLOCK
+from render import text_cache, platform_color, surface_pool
+from sprite_cache import load_frames
 
 SPRITE_FILES = {
     "idle": "Idle.png",
@@ -13,18 +17,39 @@ SPRITE_FRAME_COUNTS = {
     "run": 10,
     "jump": 10,
 }
+# Platform types, indexed by the compact type codes used by array/binary platform stores.
+PTYPES = ["regular", "moving", "conveyor", "icy", "slope", "crumble_3", "crumble_1"]
+PTYPE_CODES = {name: code for code, name in enumerate(PTYPES)}
+# Largest overlap (px) resolved by snapping onto or under a platform.
+COLLISION_SNAP = 20
+GRAVITY = 0.8
+MAX_FALL_SPEED = 10
+# How long an expired crumble platform stays gone before it comes back.
+CRUMBLE_RESPAWN_MS = 5000
+
+
+class PlayerInput(namedtuple("PlayerInput", ["left", "right", "jump", "dash"])):
+    # Per-tick key state consumed by Player.handle_input (A, D, SPACE, K).
+    @classmethod
+    def from_keys(cls, keys):
+        return cls(bool(keys[pygame.K_a]), bool(keys[pygame.K_d]),
+                   bool(keys[pygame.K_SPACE]), bool(keys[pygame.K_k]))
+
+
+NO_INPUT = PlayerInput(False, False, False, False)
 
 
 class Collectible:
-    def __init__(self, x, y, size, name, color):
+    def __init__(self, x, y, size, name, color, index=None):
         self.rect = pygame.Rect(x, y, size, size)
         self.name = name
         self.color = color
+        self.index = index  # position in collectible_defs
+        self.slot = None  # position in its CollectibleManager row
 
     def draw(self, surface, camera_offset_y):
         adj_rect = pygame.Rect(self.rect.x, self.rect.y - camera_offset_y, self.rect.width, self.rect.height)
-        swatch = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        swatch.fill(self.color)
+        swatch = surface_pool.filled(self.rect.size, self.color)
         surface.blit(swatch, (adj_rect.x, adj_rect.y))
 
 
@@ -32,7 +57,8 @@ class Platform:
     def __init__(self, x, y, width, height, ptype="regular", symbol="",
                  is_moving=False, moving_speed=0,
                  is_conveyor=False, conveyor_speed=0,
-                 is_icy=False, is_crumble=False, crumble_duration=None):
+                 is_icy=False, is_crumble=False, crumble_duration=None, clock=None):
+        self.clock = clock or REAL_CLOCK
         self.rect = pygame.Rect(x, y, width, height)
         self.original_y = y
         self.ptype = ptype
@@ -53,10 +79,10 @@ class Platform:
             if self.rect.left < 0 or self.rect.right > SCREEN_WIDTH:
                 self.moving_speed = -self.moving_speed
         if self.is_crumble and self.crumble_start_time is not None:
-            current_time = pygame.time.get_ticks()
+            current_time = self.clock.get_ticks()
             if not self.expired and (current_time - self.crumble_start_time >= self.crumble_duration):
                 self.expired = True
-            elif self.expired and (current_time - self.crumble_start_time >= self.crumble_duration + 5000):
+            elif self.expired and (current_time - self.crumble_start_time >= self.crumble_duration + CRUMBLE_RESPAWN_MS):
                 self.expired = False
                 self.crumble_start_time = None
 
@@ -64,42 +90,36 @@ class Platform:
         if self.is_crumble and self.expired:
             return
 
-        if self.ptype == "regular":
-            color = GRAY
-        elif self.ptype == "moving":
-            color = (150, 150, 250)
-        elif self.ptype == "conveyor":
-            color = YELLOW
-        elif self.ptype == "icy":
-            color = (180, 255, 255)
-        elif self.ptype == "slope":
-            color = (0, 255, 0)
-        elif self.ptype.startswith("crumble"):
-            color = (255, 100, 100)
-        else:
-            color = GRAY
-
+        color = platform_color(self.ptype)
         adj_rect = pygame.Rect(self.rect.x, self.rect.y - camera_offset_y, self.rect.width, self.rect.height)
         pygame.draw.rect(surface, color, adj_rect)
         if self.symbol:
-            text = font.render(self.symbol, True, BLACK)
+            text = text_cache.render(font, self.symbol, True, BLACK)
             text_rect = text.get_rect(center=adj_rect.center)
             surface.blit(text, text_rect)
 
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, color=WHITE, is_bot=False):
+    # (right-facing, left-facing) frame sets by draw size, shared by every Player so the
+    # sheets are loaded, sliced and scaled once per process.
+    _frame_store = {}
+
+    def __init__(self, x, y, color=WHITE, is_bot=False, headless=False, clock=None, seed=None):
         super().__init__()
+        self.clock = clock or REAL_CLOCK
+        self.rng = random.Random(seed)  # bot policy only
         self.width = 40
         self.height = 40
         self.color = color
         self.is_bot = is_bot
+        self.headless = headless
 
         self.vel_x = 0
         self.vel_y = 0
         self.speed = 5
         self.jump_strength = -15
         self.on_ground = False
+        self.last_landed = None  # platform most recently landed on
         self.coyote_time_ms = 120
         self.last_grounded_time = 0
 
@@ -115,15 +135,33 @@ class Player(pygame.sprite.Sprite):
         # Keep the collision cube, but render only sprite art.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.midbottom = (x, y)
+        self.prev_midbottom = self.rect.midbottom  # where the last update() started, for interpolation
 
         self.sprite_draw_width = int(self.width * 1.6)
         self.sprite_draw_height = int(self.height * 1.8)
-        self.sprite_frames = self._load_sprite_frames()
         self.anim_fps = {"idle": 8, "run": 12, "jump": 8}
         self.current_state = "idle"
-        self.image = self.sprite_frames["idle"][0]
+        # Headless players (simulation, bots on a server) never touch image files or the display.
+        if headless:
+            self.sprite_frames = None
+            self.sprite_frames_left = None
+            self.image = None
+        else:
+            self.sprite_frames, self.sprite_frames_left = self._load_sprite_frames()
+            self.image = self.sprite_frames["idle"][0]
 
     def _load_sprite_frames(self):
+        key = (self.sprite_draw_width, self.sprite_draw_height)
+        frame_sets = Player._frame_store.get(key)
+        if frame_sets is None:
+            paths = {state: os.path.join(SPRITES_DIR, filename) for state, filename in SPRITE_FILES.items()}
+            frames = load_frames(paths, SPRITE_FRAME_COUNTS, key, self._build_sprite_frames)
+            flipped = {state: [pygame.transform.flip(frame, True, False) for frame in state_frames]
+                       for state, state_frames in frames.items()}
+            frame_sets = Player._frame_store[key] = (frames, flipped)
+        return frame_sets
+
+    def _build_sprite_frames(self):
         frames = {}
         for state, filename in SPRITE_FILES.items():
             sprite_path = os.path.join(SPRITES_DIR, filename)
@@ -143,12 +181,12 @@ class Player(pygame.sprite.Sprite):
         return frames
 
     def apply_gravity(self):
-        self.vel_y += 0.8
-        if self.vel_y > 10:
-            self.vel_y = 10
+        self.vel_y += GRAVITY
+        if self.vel_y > MAX_FALL_SPEED:
+            self.vel_y = MAX_FALL_SPEED
 
     def can_jump(self):
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
         return self.on_ground or (now - self.last_grounded_time <= self.coyote_time_ms)
 
     def jump(self):
@@ -160,41 +198,42 @@ class Player(pygame.sprite.Sprite):
     def dash(self):
         if not self.dashing:
             self.dashing = True
-            self.dash_start_time = pygame.time.get_ticks()
+            self.dash_start_time = self.clock.get_ticks()
             self.invulnerable = True
             if self.facing_right:
                 self.vel_x += self.speed * (self.dash_boost_multiplier - 1)
             else:
                 self.vel_x -= self.speed * (self.dash_boost_multiplier - 1)
 
-    def handle_input(self):
+    def handle_input(self, inputs=None):
         if self.is_bot:
-            now = pygame.time.get_ticks()
-            if now - self.bot_timer > random.randint(1000, 3000):
-                self.vel_x = random.choice([-self.speed, self.speed])
+            now = self.clock.get_ticks()
+            if now - self.bot_timer > self.rng.randint(1000, 3000):
+                self.vel_x = self.rng.choice([-self.speed, self.speed])
                 self.bot_timer = now
             if self.rect.right > SCREEN_WIDTH - 10:
                 self.vel_x = -self.speed
             elif self.rect.left < 10:
                 self.vel_x = self.speed
-            if self.on_ground and random.random() < 0.03:
+            if self.on_ground and self.rng.random() < 0.03:
                 self.jump()
             return
 
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_k] and not self.dashing:
+        if inputs is None:
+            inputs = PlayerInput.from_keys(pygame.key.get_pressed())
+        if inputs.dash and not self.dashing:
             self.dash()
 
-        if keys[pygame.K_a]:
+        if inputs.left:
             self.vel_x = -self.speed
             self.facing_right = False
-        elif keys[pygame.K_d]:
+        elif inputs.right:
             self.vel_x = self.speed
             self.facing_right = True
         elif not self.dashing:
             self.vel_x = 0
 
-        if keys[pygame.K_SPACE]:
+        if inputs.jump:
             self.jump()
 
     def _update_animation(self):
@@ -204,27 +243,37 @@ class Player(pygame.sprite.Sprite):
             self.current_state = "run"
         else:
             self.current_state = "idle"
+        if self.headless:
+            return
 
-        frames = self.sprite_frames[self.current_state]
-        elapsed_ms = pygame.time.get_ticks()
+        if self.facing_right:
+            frames = self.sprite_frames[self.current_state]
+        else:
+            frames = self.sprite_frames_left[self.current_state]
+        elapsed_ms = self.clock.get_ticks()
         frame_index = (elapsed_ms * self.anim_fps[self.current_state] // 1000) % len(frames)
-        frame = frames[frame_index]
-        if not self.facing_right:
-            frame = pygame.transform.flip(frame, True, False)
-        self.image = frame
+        self.image = frames[frame_index]
+
+    def interpolated_midbottom(self, alpha):
+        # Position between the previous step (alpha 0) and the current one (alpha 1).
+        px, py = self.prev_midbottom
+        x, y = self.rect.midbottom
+        return round(px + (x - px) * alpha), round(py + (y - py) * alpha)
 
-    def get_draw_rect(self, camera_offset_y):
+    def get_draw_rect(self, camera_offset_y, alpha=1.0):
         draw_rect = self.image.get_rect()
-        draw_rect.midbottom = (self.rect.centerx, self.rect.bottom - camera_offset_y)
+        x, y = self.interpolated_midbottom(alpha)
+        draw_rect.midbottom = (x, y - camera_offset_y)
         return draw_rect
 
-    def draw(self, surface, camera_offset_y):
-        surface.blit(self.image, self.get_draw_rect(camera_offset_y))
+    def draw(self, surface, camera_offset_y, alpha=1.0):
+        surface.blit(self.image, self.get_draw_rect(camera_offset_y, alpha))
 
-    def update(self, platforms, keys=None):
-        self.handle_input()
+    def update(self, tower, inputs=None):
+        self.prev_midbottom = self.rect.midbottom
+        self.handle_input(inputs)
 
-        if self.dashing and (pygame.time.get_ticks() - self.dash_start_time >= self.dash_duration_ms):
+        if self.dashing and (self.clock.get_ticks() - self.dash_start_time >= self.dash_duration_ms):
             self.dashing = False
             self.invulnerable = False
             if self.vel_x > 0:
@@ -237,14 +286,17 @@ class Player(pygame.sprite.Sprite):
         self.rect.y += int(self.vel_y)
         self.on_ground = False
 
-        for plat in platforms:
+        # Snapping moves the rect by less than COLLISION_SNAP, so widen the band by that much
+        # to see every platform the full scan would have.
+        for plat in tower.query_band(self.rect.top - COLLISION_SNAP, self.rect.bottom + COLLISION_SNAP):
             if self.rect.colliderect(plat.rect):
-                if self.vel_y > 0 and (self.rect.bottom - plat.rect.top) < 20:
+                if self.vel_y > 0 and (self.rect.bottom - plat.rect.top) < COLLISION_SNAP:
                     self.rect.bottom = plat.rect.top
                     self.vel_y = 0
                     self.on_ground = True
-                    self.last_grounded_time = pygame.time.get_ticks()
-                elif self.vel_y < 0 and (plat.rect.bottom - self.rect.top) < 20:
+                    self.last_grounded_time = self.clock.get_ticks()
+                    self.last_landed = plat
+                elif self.vel_y < 0 and (plat.rect.bottom - self.rect.top) < COLLISION_SNAP:
                     self.rect.top = plat.rect.bottom
                     self.vel_y = 0
 
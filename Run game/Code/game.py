@@ -1,30 +1,52 @@
 # game.py
-import pygame, sys, random, os
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, PIXELS_PER_METER, collectible_defs, achievement_defs, WHITE, DARK_GRAY, BLACK, YELLOW, LIGHT_GREY, HIGHSCORES_PATH, MUSIC_DIR
+import pygame, sys, os, random
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, collectible_defs, achievement_defs, WHITE, DARK_GRAY, BLACK, YELLOW, LIGHT_GREY, RENDER_FPS, MAX_CATCHUP_STEPS
 from utils import wrap_text
-from entities import Collectible, Player
+from render import text_cache, platform_atlas, surface_pool, GameplayRenderer
+from entities import Player, PlayerInput
 # game.py
 from world import Tower  # Instead of importing from entities
+from simulation import Simulation
+from chunks import ChunkCache
+from clock import STEP_MS
+from profiler import FrameProfiler
+from replay import Recording, ReplayWriter
+from audio import SoundBank
+from music import MusicLibrary, MusicPlayer
+from leaderboard import Leaderboard
+from player_profile import PlayerProfile
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("A Needed Climb")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont(None, 36)
+        self.text = text_cache
+        self.renderer = GameplayRenderer(self.screen, self.font)
         self.state = "MENU"
         self.menu_options = ["A Normal Climb", "A Harder Climb", "High Scores", "Music", "Credits", "Collectibles"]
         self.menu_index = 0
-        self.all_music = ["Music 1", "Music 2", "Music 3", "Music 4", "Music 5",
-                          "Music 6", "Music 7", "Music 8", "Music 9", "Music 10", "Off"]
+        # Tracks come from scanning MUSIC_DIR; loading and fading happen on the player's thread.
+        self.music_library = MusicLibrary()
+        self.music_library.scan()
+        self.music_player = MusicPlayer()
         self.current_music = None
-        self.high_scores = self.load_high_scores()
-        self.collected_collectibles = set()   # random collectibles (indices 0-15)
-        self.unlocked_achievements = set()      # achievements (indices 0-15)
+        self.replays = ReplayWriter()  # last.replay plus the most recent deaths
+        self.leaderboard = Leaderboard()
+        self.leaderboard.load()
+        # Collectibles, achievements and lifetime counters persist in the profile.
+        self.profile = PlayerProfile()
+        self.profile.load()
+        self.collected_collectibles = self.profile.collectibles   # random collectibles (indices 0-15)
+        self.unlocked_achievements = self.profile.achievements    # achievements (indices 0-15)
         self.player_color = WHITE
         self.special_mode = False  # False = Normal; True = Harder
+        self.seed = seed  # tower seed for every climb (main.py --seed/--daily); None = a fresh random tower
+        self.chunk_cache = ChunkCache()  # seeded towers load from pregenerated chunks
+        self.profiler = FrameProfiler()  # F3 toggles the frame-time overlay, F4 dumps traces
         self.collectibles_page = "Random"  # "Random" or "Achievements"
         # Dialog triggers (score thresholds in m mapped to dialog MP3 file names)
         self.dialog_triggers = {1000: "up1.mp3",
@@ -33,29 +55,40 @@ class Game:
                                 7000: "up4.mp3",
                                 9000: "up5.mp3"}
         self.death_dialog = "death.mp3"
+        # Dialog clips are decoded in the background now so playing one never stalls a frame.
+        self.sounds = SoundBank()
+        self.sounds.preload(list(self.dialog_triggers.values()) + [self.death_dialog])
         # Demo bot for menu background:
         self.demo_tower = Tower(SCREEN_HEIGHT - 50, special_mode=False)
         self.demo_bot = Player(SCREEN_WIDTH//2, SCREEN_HEIGHT - 100, color=self.player_color, is_bot=True)
 
     @property
     def all_music(self):
-        return self._all_music
-    @all_music.setter
-    def all_music(self, value):
-        self._all_music = value
+        # Music menu entries: every track in the library, then "Off".
+        return [track.label for track in self.music_library.tracks] + ["Off"]
 
-    def load_high_scores(self):
-        if os.path.exists(HIGHSCORES_PATH):
-            with open(HIGHSCORES_PATH, "r") as f:
-                scores = [float(line.strip()) for line in f.readlines()]
-            scores.sort(reverse=True)
-            return scores[:5]
-        else:
+    @property
+    def high_scores(self):
+        # Best scores across both modes.
+        return self.leaderboard.scores()
+
+    @property
+    def mode_name(self):
+        return "harder" if self.special_mode else "normal"
+
+    def wait_events(self, timeout=0):
+        # Blocks until an event arrives (or timeout ms pass, if non-zero) and returns everything
+        # queued. Static screens use this instead of a 60 FPS poll, so they sit idle between keys.
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
             return []
-    def save_high_scores(self):
-        with open(HIGHSCORES_PATH, "w") as f:
-            for score in self.high_scores:
-                f.write(f"{score}\n")
+        return [event] + pygame.event.get()
+    def handle_profiler_key(self, key):
+        if key == pygame.K_F3:
+            self.profiler.toggle()
+        elif key == pygame.K_F4 and self.profiler.trace:
+            for path in self.profiler.dump_all():
+                print("Wrote frame trace", path)
     def run(self):
         while True:
             if self.state == "MENU":
@@ -80,17 +113,21 @@ class Game:
     # ---------------- Menu Loop with Demo Bot Background ----------------
     def menu_loop(self):
         running = True
+        profiler = self.profiler
         while running and self.state == "MENU":
-            self.demo_bot.update(self.demo_tower.platforms)
+            profiler.begin("menu")
+            self.demo_bot.update(self.demo_tower)
+            profiler.mark("bot")
             camera_offset = self.demo_bot.rect.y - SCREEN_HEIGHT//2
             self.screen.fill(DARK_GRAY)
-            for plat in self.demo_tower.platforms:
-                plat.draw(self.screen, self.font, camera_offset)
+            platform_atlas.draw(self.screen, self.demo_tower.iter_platforms(), self.font, camera_offset)
             self.demo_bot.draw(self.screen, camera_offset)
+            profiler.mark("draw")
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
+                    self.handle_profiler_key(event.key)
                     if event.key == pygame.K_UP:
                         self.menu_index = (self.menu_index - 1) % len(self.menu_options)
                     elif event.key == pygame.K_DOWN:
@@ -118,39 +155,50 @@ class Game:
                             self.collectibles_page = "Random"
                             self.state = "COLLECTIBLES"
                             running = False
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,200))
-            self.screen.blit(overlay, (0,0))
+            self.screen.blit(surface_pool.overlay((0,0,0,200)), (0,0))
             for i, option in enumerate(self.menu_options):
-                text = self.font.render(option, True, WHITE)
+                text = self.text.render(self.font, option, True, WHITE)
                 self.screen.blit(text, (80, 100 + i*50))
                 if i == self.menu_index:
-                    selector = self.font.render(">", True, WHITE)
+                    selector = self.text.render(self.font, ">", True, WHITE)
                     self.screen.blit(selector, (40, 100 + i*50))
+            profiler.mark("text")
+            profiler.draw(self.screen)
+            profiler.mark("overlay")
             pygame.display.flip()
+            profiler.mark("flip")
             self.clock.tick(FPS)
+            profiler.mark("tick")
+            profiler.end()
 
     # ---------------- High Scores Loop ----------------
     def high_scores_loop(self):
         running = True
+        redraw = True
         while running and self.state == "HIGH_SCORES":
-            for event in pygame.event.get():
+            if redraw:
+                self.screen.fill(BLACK)
+                title = self.text.render(self.font, "High Scores", True, WHITE)
+                self.screen.blit(title, (50,50))
+                for column, (mode, heading) in enumerate([("normal", "Normal"), ("harder", "Harder")]):
+                    x = 50 + column*350
+                    self.screen.blit(self.text.render(self.font, heading, True, YELLOW), (x, 100))
+                    for i, score in enumerate(self.leaderboard.scores(mode)):
+                        score_text = self.text.render(self.font, f"{i+1}. {score:.1f} m", True, WHITE)
+                        self.screen.blit(score_text, (x, 140 + i*40))
+                info = self.text.render(self.font, "Press ESC or Enter to return", True, WHITE)
+                self.screen.blit(info, (50,380))
+                pygame.display.flip()
+                redraw = False
+            for event in self.wait_events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
                     if event.key in (pygame.K_ESCAPE, pygame.K_RETURN):
                         self.state = "MENU"
                         running = False
-            self.screen.fill(BLACK)
-            title = self.font.render("High Scores", True, WHITE)
-            self.screen.blit(title, (50,50))
-            for i, score in enumerate(self.high_scores):
-                score_text = self.font.render(f"{i+1}. {score:.1f} m", True, WHITE)
-                self.screen.blit(score_text, (50, 100 + i*40))
-            info = self.font.render("Press ESC or Enter to return", True, WHITE)
-            self.screen.blit(info, (50,300))
-            pygame.display.flip()
-            self.clock.tick(FPS)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    redraw = True
 
     # ---------------- Music Menu with Paging (loads from "Music" folder) ----------------
     def music_menu_loop(self):
@@ -163,10 +211,11 @@ class Game:
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
+                    on_page = min(page_size, len(self.all_music) - current_page*page_size)
                     if event.key == pygame.K_UP:
-                        selected = (selected - 1) % page_size
+                        selected = (selected - 1) % on_page
                     elif event.key == pygame.K_DOWN:
-                        selected = (selected + 1) % page_size
+                        selected = (selected + 1) % on_page
                     elif event.key == pygame.K_LEFT:
                         current_page = max(0, current_page - 1)
                         selected = 0
@@ -175,49 +224,47 @@ class Game:
                             current_page += 1
                             selected = 0
                     elif event.key == pygame.K_RETURN:
-                        choice = self.all_music[current_page*page_size + selected]
-                        if choice == "Off":
-                            pygame.mixer.music.stop()
+                        idx = current_page*page_size + selected
+                        tracks = self.music_library.tracks
+                        if idx >= len(tracks):  # "Off"
+                            self.music_player.stop()
                             self.current_music = None
                         else:
-                            track_num = choice.split()[-1]
-                            filename = os.path.join(MUSIC_DIR, f"music_{track_num}.mp3")
-                            try:
-                                pygame.mixer.music.load(filename)
-                                pygame.mixer.music.play(-1)
-                                self.current_music = filename
-                            except Exception as e:
-                                print("Failed to load", filename, e)
+                            self.music_player.play(tracks[idx].path)
+                            self.current_music = tracks[idx].path
                         active = False
                     elif event.key == pygame.K_ESCAPE:
                         active = False
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,150))
-            self.screen.blit(overlay, (0,0))
+            self.screen.blit(surface_pool.overlay((0,0,0,150)), (0,0))
             menu_width, menu_height = 300,300
             menu_x = (SCREEN_WIDTH-menu_width)//2
             menu_y = (SCREEN_HEIGHT-menu_height)//2
             pygame.draw.rect(self.screen, DARK_GRAY, (menu_x, menu_y, menu_width, menu_height))
-            title = self.font.render("Select Music", True, WHITE)
+            title = self.text.render(self.font, "Select Music", True, WHITE)
             title_rect = title.get_rect(center=(menu_x+menu_width//2, menu_y+30))
             self.screen.blit(title, title_rect)
             for i in range(page_size):
                 idx = current_page*page_size + i
                 if idx < len(self.all_music):
                     option = self.all_music[idx]
-                    text = self.font.render(option, True, WHITE)
+                    if idx < len(self.music_library.tracks) and self.music_library.tracks[idx].duration:
+                        minutes, seconds = divmod(int(self.music_library.tracks[idx].duration), 60)
+                        option = f"{option}  {minutes}:{seconds:02d}"
+                    text = self.text.render(self.font, option, True, WHITE)
                     text_rect = text.get_rect(center=(menu_x+menu_width//2, menu_y+70+i*40))
                     self.screen.blit(text, text_rect)
                     if i == selected:
-                        selector = self.font.render(">", True, WHITE)
+                        selector = self.text.render(self.font, ">", True, WHITE)
                         sel_rect = selector.get_rect(center=(menu_x+30, menu_y+70+i*40))
                         self.screen.blit(selector, sel_rect)
-            page_text = self.font.render(f"Page {current_page+1} of {((len(self.all_music)-1)//page_size)+1}", True, WHITE)
+            page_text = self.text.render(self.font, f"Page {current_page+1} of {((len(self.all_music)-1)//page_size)+1}", True, WHITE)
             page_rect = page_text.get_rect(center=(menu_x+menu_width//2, menu_y+menu_height-30))
             self.screen.blit(page_text, page_rect)
             pygame.display.flip()
             self.clock.tick(FPS)
-        self.state = "MENU"
+        # From the pause menu the climb is still in progress, so only leave the MUSIC state.
+        if self.state == "MUSIC":
+            self.state = "MENU"
 
     # ---------------- Credits Loop with Word Wrapping ----------------
     def credits_loop(self):
@@ -234,25 +281,29 @@ class Game:
                 milestone += 500
             record_msg = f"My record is {milestone}m, can you beat it?"
         running = True
+        redraw = True
         while running and self.state == "CREDITS":
-            for event in pygame.event.get():
+            if redraw:
+                self.screen.fill(BLACK)
+                y = 50
+                for line in wrapped_lines:
+                    text = self.text.render(self.font, line, True, WHITE)
+                    self.screen.blit(text, (50, y))
+                    y += 40
+                footer_text = self.text.render(self.font, footer, True, WHITE)
+                self.screen.blit(footer_text, (50, SCREEN_HEIGHT-90))
+                record_text = self.text.render(self.font, record_msg, True, WHITE)
+                self.screen.blit(record_text, (50, SCREEN_HEIGHT-50))
+                pygame.display.flip()
+                redraw = False
+            for event in self.wait_events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
                     self.state = "MENU"
                     running = False
-            self.screen.fill(BLACK)
-            y = 50
-            for line in wrapped_lines:
-                text = self.font.render(line, True, WHITE)
-                self.screen.blit(text, (50, y))
-                y += 40
-            footer_text = self.font.render(footer, True, WHITE)
-            self.screen.blit(footer_text, (50, SCREEN_HEIGHT-90))
-            record_text = self.font.render(record_msg, True, WHITE)
-            self.screen.blit(record_text, (50, SCREEN_HEIGHT-50))
-            pygame.display.flip()
-            self.clock.tick(FPS)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    redraw = True
 
     # ---------------- Collectibles Loop (Two Pages: Random and Achievements) ----------------
     def collectibles_loop(self):
@@ -270,15 +321,81 @@ class Game:
         show_tab_info = True
         message = ""
         message_timer = 0
+        message_rect = pygame.Rect(0, SCREEN_HEIGHT-50, SCREEN_WIDTH, self.font.get_linesize())
+
+        def cell_color(idx):
+            if page == "Random":
+                if idx in self.collected_collectibles:
+                    return collectible_defs[idx][1], collectible_defs[idx][0]
+            elif idx in self.unlocked_achievements:
+                return achievement_defs[idx][1], achievement_defs[idx][0]
+            return LIGHT_GREY, "???"
+
+        def draw_cell(row, col):
+            # Repaints one swatch and its selector frame; returns the rect touched.
+            cell_x = start_x + padding + col * (cell_size + padding)
+            cell_y = start_y + padding + row * (cell_size + padding)
+            frame_rect = pygame.Rect(cell_x-2, cell_y-2, cell_size+4, cell_size+4)
+            self.screen.fill(BLACK, frame_rect)
+            swatch = surface_pool.filled((cell_size, cell_size), cell_color(row * grid_cols + col)[0])
+            self.screen.blit(swatch, (cell_x, cell_y))
+            if (row, col) == (sel_row, sel_col):
+                pygame.draw.rect(self.screen, YELLOW, frame_rect, 3)
+            return frame_rect
+
+        def draw_message():
+            self.screen.fill(BLACK, message_rect)
+            if message:
+                msg_text = self.text.render(self.font, message, True, WHITE)
+                self.screen.blit(msg_text, (50, SCREEN_HEIGHT-50))
+            return message_rect
+
+        # Retained rendering: the page is drawn once, then only the cells the selector
+        # leaves/enters and the message line are repainted and pushed to the display.
         running = True
+        redraw = True
         while running and self.state == "COLLECTIBLES":
-            for event in pygame.event.get():
+            dirty = []
+            if redraw:
+                self.screen.fill(BLACK)
+                header = self.text.render(self.font, f"{page} Collectibles", True, WHITE)
+                self.screen.blit(header, (50, 20))
+                for row in range(grid_rows):
+                    for col in range(grid_cols):
+                        draw_cell(row, col)
+                        name = cell_color(row * grid_cols + col)[1]
+                        cell_x = start_x + padding + col * (cell_size + padding)
+                        cell_y = start_y + padding + row * (cell_size + padding)
+                        name_text = self.text.render(self.font, name, True, WHITE)
+                        text_rect = name_text.get_rect(center=(cell_x+cell_size//2, cell_y+cell_size+15))
+                        self.screen.blit(name_text, text_rect)
+                if show_tab_info:
+                    info = self.text.render(self.font, "Press TAB to toggle page", True, WHITE)
+                    self.screen.blit(info, (50, SCREEN_HEIGHT-550))
+                draw_message()
+                pygame.display.flip()
+                redraw = False
+
+            # Sleep until a key arrives, or until the current message is due to disappear.
+            timeout = 0
+            if message:
+                timeout = max(1, 2000 - (pygame.time.get_ticks() - message_timer))
+            events = self.wait_events(timeout)
+            if message and pygame.time.get_ticks() - message_timer >= 2000:
+                message = ""
+                dirty.append(draw_message())
+
+            for event in events:
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
+                elif event.type == pygame.WINDOWEXPOSED:
+                    redraw = True
                 elif event.type == pygame.KEYDOWN:
+                    old_sel = (sel_row, sel_col)
                     if event.key == pygame.K_TAB:
                         page = "Achievements" if page == "Random" else "Random"
                         show_tab_info = False
+                        redraw = True
                     elif event.key == pygame.K_UP:
                         sel_row = (sel_row - 1) % grid_rows
                     elif event.key == pygame.K_DOWN:
@@ -294,50 +411,15 @@ class Game:
                         else:
                             message = achievement_defs[idx][0] if idx in self.unlocked_achievements else "You haven't unlocked that achievement yet!"
                         message_timer = pygame.time.get_ticks()
+                        dirty.append(draw_message())
                     elif event.key == pygame.K_ESCAPE:
                         running = False
                         self.state = "MENU"
-            self.screen.fill(BLACK)
-            header = self.font.render(f"{page} Collectibles", True, WHITE)
-            self.screen.blit(header, (50, 20))
-            for row in range(grid_rows):
-                for col in range(grid_cols):
-                    idx = row * grid_cols + col
-                    if page == "Random":
-                        if idx in self.collected_collectibles:
-                            color = collectible_defs[idx][1]
-                            name = collectible_defs[idx][0]
-                        else:
-                            color = LIGHT_GREY
-                            name = "???"
-                    else:
-                        if idx in self.unlocked_achievements:
-                            color = achievement_defs[idx][1]
-                            name = achievement_defs[idx][0]
-                        else:
-                            color = LIGHT_GREY
-                            name = "???"
-                    cell_x = start_x + padding + col * (cell_size + padding)
-                    cell_y = start_y + padding + row * (cell_size + padding)
-                    cell_rect = pygame.Rect(cell_x, cell_y, cell_size, cell_size)
-                    s = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
-                    s.fill(color)
-                    self.screen.blit(s, (cell_x, cell_y))
-                    name_text = self.font.render(name, True, WHITE)
-                    text_rect = name_text.get_rect(center=(cell_x+cell_size//2, cell_y+cell_size+15))
-                    self.screen.blit(name_text, text_rect)
-            sel_x = start_x + padding + sel_col * (cell_size + padding)
-            sel_y = start_y + padding + sel_row * (cell_size + padding)
-            selector_rect = pygame.Rect(sel_x-2, sel_y-2, cell_size+4, cell_size+4)
-            pygame.draw.rect(self.screen, YELLOW, selector_rect, 3)
-            if show_tab_info:
-                info = self.font.render("Press TAB to toggle page", True, WHITE)
-                self.screen.blit(info, (50, SCREEN_HEIGHT-550))
-            if message and pygame.time.get_ticks() - message_timer < 2000:
-                msg_text = self.font.render(message, True, WHITE)
-                self.screen.blit(msg_text, (50, SCREEN_HEIGHT-50))
-            pygame.display.flip()
-            self.clock.tick(FPS)
+                    if (sel_row, sel_col) != old_sel:
+                        dirty.append(draw_cell(*old_sel))
+                        dirty.append(draw_cell(sel_row, sel_col))
+            if dirty and not redraw:
+                pygame.display.update(dirty)
         self.collectibles_page = page
 
     # ---------------- Narrative Loop (Blank, wait one key) ----------------
@@ -348,113 +430,96 @@ class Game:
         pygame.display.flip()
         waiting = True
         while waiting and self.state == "NARRATIVE":
-            for event in pygame.event.get():
+            for event in self.wait_events():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
                     waiting = False
                     self.state = "GAMEPLAY"
-            self.clock.tick(FPS)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    pygame.display.flip()
 
     # ---------------- Gameplay Loop with Dialog and Slope Platforms ----------------
     def gameplay_loop(self):
-        start_y = SCREEN_HEIGHT - 50
-        new_start_y = start_y  # No checkpoints now.
-        player = Player(SCREEN_WIDTH//2, new_start_y - (37//2), color=self.player_color)
-        tower = Tower(new_start_y, special_mode=self.special_mode)
-        score = 0.0
-        max_height = player.rect.y
-        spawned_collectibles = []
-        last_collectible_spawn = 0
+        # Every climb gets a concrete seed so its recording replays exactly.
+        seed = self.seed if self.seed is not None else random.getrandbits(63)
+        recording = Recording(seed, self.special_mode, self.collected_collectibles)
+        sim = Simulation(special_mode=self.special_mode, collected=self.collected_collectibles,
+                         color=self.player_color, headless=False, seed=seed,
+                         chunks=self.chunk_cache if self.seed is not None else None, prefetch=True,
+                         profiler=self.profiler)
+        profiler = self.profiler
         dialog_played = set()
+        known_collectibles = len(self.collected_collectibles)
+        # Physics advances in fixed STEP_MS steps however fast frames are drawn; time left over
+        # in the accumulator sets how far between the last two steps the frame is drawn.
+        accumulator = 0.0
+        self.clock.tick()
         running = True
         while running and self.state == "GAMEPLAY":
-            dt = self.clock.tick(FPS)
+            profiler.begin("gameplay")
+            # After a stall, catch up at most MAX_CATCHUP_STEPS rather than spiralling.
+            accumulator = min(accumulator + self.clock.tick(RENDER_FPS), STEP_MS * MAX_CATCHUP_STEPS)
+            profiler.mark("tick")
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 elif event.type == pygame.KEYDOWN:
+                    self.handle_profiler_key(event.key)
                     if event.key == pygame.K_ESCAPE:
                         pause_choice = self.pause_loop()
                         if pause_choice == "quit":
+                            sim.close()
+                            self.save_replay(recording, sim)
+                            self.profile.record_climb(sim.score, False, sim.steps * STEP_MS / 1000)
                             self.state = "MENU"
                             return
-            player.update(tower.platforms)
-            if player.rect.y < max_height:
-                max_height = player.rect.y
-            if player.rect.y > max_height + 1000:
+                        self.clock.tick()  # the pause doesn't count as elapsed game time
+                        profiler.begin("gameplay")  # don't charge the pause to this frame
+            profiler.mark("events")
+            inputs = PlayerInput.from_keys(pygame.key.get_pressed())
+            profiler.mark("input")
+            while accumulator >= STEP_MS and not sim.dead:
+                sim.step(inputs)
+                recording.record(inputs)
+                accumulator -= STEP_MS
+            if sim.dead:
                 running = False
                 self.state = "GAME_OVER"
                 if "death" not in dialog_played:
-                    try:
-                        death_sound = pygame.mixer.Sound(os.path.join("Dialog", self.death_dialog))
-                        death_sound.play()
-                    except Exception as e:
-                        print("Failed to play death dialog:", e)
+                    self.sounds.play(self.death_dialog)
                     dialog_played.add("death")
-            score = (new_start_y - player.rect.y) / PIXELS_PER_METER
             for thresh, dlg_file in self.dialog_triggers.items():
-                if score >= thresh and thresh not in dialog_played:
-                    try:
-                        dlg_sound = pygame.mixer.Sound(os.path.join("Dialog", dlg_file))
-                        dlg_sound.play()
-                    except Exception as e:
-                        print("Failed to play dialog", dlg_file, e)
+                if sim.score >= thresh and thresh not in dialog_played:
+                    self.sounds.play(dlg_file)
                     dialog_played.add(thresh)
-            if score - last_collectible_spawn >= 200:
-                last_collectible_spawn = score
-                if random.random() < 1/8:
-                    candidate = random.randint(0, 15)
-                    if candidate not in self.collected_collectibles:
-                        camera_offset_y = player.rect.y - SCREEN_HEIGHT//2
-                        x = random.randint(50, SCREEN_WIDTH-50)
-                        y = camera_offset_y + random.randint(50, SCREEN_HEIGHT//2)
-                        spawned_collectibles.append(Collectible(x, y, 20, collectible_defs[candidate][0], collectible_defs[candidate][1]))
-            camera_offset_y = player.rect.y - SCREEN_HEIGHT//2
-            for col in spawned_collectibles[:]:
-                if player.rect.colliderect(col.rect):
-                    for idx, (name, color) in enumerate(collectible_defs):
-                        if name == col.name:
-                            self.collected_collectibles.add(idx)
-                            break
-                    spawned_collectibles.remove(col)
-            tower.update(camera_offset_y)
-            # Update slope platforms:
-            for plat in tower.platforms:
-                if plat.ptype == "slope":
-                    if player.rect.colliderect(plat.rect):
-                        if plat.rect.y < plat.original_y + 30:
-                            plat.rect.y += 1
-                    else:
-                        if plat.rect.y > plat.original_y:
-                            plat.rect.y -= 1
-            self.screen.fill(DARK_GRAY)
-            for plat in tower.platforms:
-                plat.draw(self.screen, self.font, camera_offset_y)
-            for col in spawned_collectibles:
-                col.draw(self.screen, camera_offset_y)
-            player.draw(self.screen, camera_offset_y)
-            score_text = self.font.render(f"Height: {score:.1f} m", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
+            if len(self.collected_collectibles) != known_collectibles:
+                known_collectibles = len(self.collected_collectibles)
+                self.profile.save()  # written behind, off this thread
+            profiler.mark("dialog")
+            self.renderer.draw(sim, 1.0 if sim.dead else accumulator / STEP_MS)
+            profiler.mark("draw")
+            profiler.draw(self.screen)
+            profiler.mark("overlay")
             pygame.display.flip()
+            profiler.mark("flip")
+            profiler.end()
+        sim.close()
+        self.save_replay(recording, sim)
+        score = sim.score
         if self.state == "GAME_OVER":
             self.game_over_screen(score)
-            if not self.special_mode:
-                for i in range(8):
-                    threshold = 500 * (i+1)
-                    if score >= threshold:
-                        self.unlocked_achievements.add(i)
-            else:
-                for i in range(8):
-                    threshold = 500 * (i+1)
-                    if score >= threshold:
-                        self.unlocked_achievements.add(8+i)
-            self.high_scores.append(score)
-            self.high_scores.sort(reverse=True)
-            self.high_scores = self.high_scores[:5]
-            self.save_high_scores()
+            self.profile.unlock_height_achievements(self.special_mode, score)
+            self.profile.record_climb(score, True, sim.steps * STEP_MS / 1000)
+            # Written to disk by the leaderboard's own thread.
+            self.leaderboard.submit(score, self.mode_name, sim.seed, sim.steps * STEP_MS / 1000)
             self.state = "MENU"
 
+    def save_replay(self, recording, sim):
+        # Written by the replay writer's thread; see ReplayWriter for what is kept.
+        recording.finish(sim)
+        self.replays.save(recording)
+
     # ---------------- Game Over Screen ----------------
     def game_over_screen(self, score):
         running = True
@@ -493,24 +558,22 @@ class Game:
                         elif choice == "Music Options":
                             self.music_menu_loop()
                         elif choice == "High Scores":
-                            self.high_scores_loop()
+                            self.pause_high_scores_loop()
                         elif choice == "Quit to Menu":
                             return "quit"
                     elif event.key == pygame.K_ESCAPE:
                         paused = False
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,150))
-            self.screen.blit(overlay, (0,0))
+            self.screen.blit(surface_pool.overlay((0,0,0,150)), (0,0))
             menu_width, menu_height = 300,200
             menu_x = (SCREEN_WIDTH - menu_width) // 2
             menu_y = (SCREEN_HEIGHT - menu_height) // 2
             pygame.draw.rect(self.screen, DARK_GRAY, (menu_x, menu_y, menu_width, menu_height))
             for i, option in enumerate(options):
-                text = self.font.render(option, True, WHITE)
+                text = self.text.render(self.font, option, True, WHITE)
                 text_rect = text.get_rect(center=(menu_x+menu_width//2, menu_y+40+i*40))
                 self.screen.blit(text, text_rect)
                 if i == selected:
-                    selector = self.font.render(">", True, WHITE)
+                    selector = self.text.render(self.font, ">", True, WHITE)
                     sel_rect = selector.get_rect(center=(menu_x+30, menu_y+40+i*40))
                     self.screen.blit(selector, sel_rect)
             pygame.display.flip()
@@ -528,19 +591,17 @@ class Game:
                 elif event.type == pygame.KEYDOWN:
                     if event.key in (pygame.K_ESCAPE, pygame.K_RETURN):
                         active = False
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,150))
-            self.screen.blit(overlay, (0,0))
+            self.screen.blit(surface_pool.overlay((0,0,0,150)), (0,0))
             menu_width, menu_height = 300,300
             menu_x = (SCREEN_WIDTH-menu_width)//2
             menu_y = (SCREEN_HEIGHT-menu_height)//2
             pygame.draw.rect(self.screen, DARK_GRAY, (menu_x, menu_y, menu_width, menu_height))
-            title = self.font.render("High Scores", True, WHITE)
+            title = self.text.render(self.font, f"High Scores ({self.mode_name.title()})", True, WHITE)
             self.screen.blit(title, (menu_x+20, menu_y+20))
-            for i, score in enumerate(self.high_scores):
-                score_text = self.font.render(f"{i+1}. {score:.1f} m", True, WHITE)
+            for i, score in enumerate(self.leaderboard.scores(self.mode_name)):
+                score_text = self.text.render(self.font, f"{i+1}. {score:.1f} m", True, WHITE)
                 self.screen.blit(score_text, (menu_x+20, menu_y+60+i*40))
-            info = self.font.render("Press ESC or Enter to return", True, WHITE)
+            info = self.text.render(self.font, "Press ESC or Enter to return", True, WHITE)
             self.screen.blit(info, (menu_x+20, menu_y+menu_height-40))
             pygame.display.flip()
             self.clock.tick(FPS)
@@ -549,5 +610,4 @@ class Game:
 
 if __name__ == "__main__":
     game = Game()
-    game.unlocked_achievements = set()
     game.run()
@@ -0,0 +1,202 @@
+import atexit
+import heapq
+import math
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from settings import LEADERBOARD_PATH, HIGHSCORES_PATH
+from utils import atomic_write
+
+MODES = ("normal", "harder")
+TOP_K = 5
+
+# File: header (magic, version), then one fixed-size record per finished climb, appended and
+# never rewritten in place. Each record ends in a CRC32 of its other fields, so a record torn
+# by a crash mid-write is recognised and skipped.
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<dBQdf")
+CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + CRC.size
+MAGIC = b"CLLB"
+VERSION = 1
+MODE_MASK = 1  # low bit of the flags byte: index into MODES
+FLAG_NO_SEED = 2  # imported from the old highscores.txt, which kept neither seed nor mode
+
+# seed is None for imported scores; duration is in seconds of game time.
+Record = namedtuple("Record", "score mode seed timestamp duration")
+
+
+def pack_record(record):
+    flags = MODES.index(record.mode) | (FLAG_NO_SEED if record.seed is None else 0)
+    body = RECORD.pack(record.score, flags, record.seed or 0,
+                       record.timestamp, record.duration)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def unpack_records(data):
+    # Every intact record in data (the file minus its header); stops at the first torn one.
+    records = []
+    for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = data[offset:offset + RECORD.size]
+        (crc,) = CRC.unpack_from(data, offset + RECORD.size)
+        if zlib.crc32(body) != crc:
+            break
+        score, flags, seed, timestamp, duration = RECORD.unpack(body)
+        seed = None if flags & FLAG_NO_SEED else seed
+        records.append(Record(score, MODES[flags & MODE_MASK], seed, timestamp, duration))
+    return records
+
+
+class Leaderboard:
+    # Every finished climb, appended to a log on disk, with the best TOP_K per mode held in
+    # min-heaps. submit() updates the heaps at once and hands the disk write to a background
+    # thread, so game over never waits on the file. When the log grows past compact_after
+    # records it is rewritten (atomically) to the best `retain` records per mode.
+    def __init__(self, path=LEADERBOARD_PATH, k=TOP_K, retain=1000, compact_after=5000):
+        self.path = path
+        self.k = k
+        self.retain = retain
+        self.compact_after = compact_after
+        self._heaps = {mode: [] for mode in MODES}
+        self._count = 0  # records in the log file
+        self._valid_bytes = None  # length of the log up to its last intact record, once read
+        self._writes = queue.Queue()
+        self._writer = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self._import_legacy()
+            return
+        for record in self._scan():
+            self._push(record)
+
+    def _scan(self):
+        # Reads the log's intact records and notes where they end. An unreadable log is moved
+        # aside (and the next append starts a new one) rather than appended over.
+        with open(self.path, "rb") as f:
+            data = f.read()
+        magic, version = HEADER.unpack_from(data, 0) if len(data) >= HEADER.size else (None, None)
+        if magic != MAGIC or version != VERSION:
+            print(f"Not a v{VERSION} leaderboard, moving it aside:", self.path)
+            os.replace(self.path, self.path + ".bad")
+            self._count = 0
+            self._valid_bytes = None
+            return []
+        records = unpack_records(memoryview(data)[HEADER.size:])
+        self._count = len(records)
+        self._valid_bytes = HEADER.size + len(records) * RECORD_SIZE
+        return records
+
+    def _import_legacy(self, legacy_path=HIGHSCORES_PATH):
+        # One-off: carry highscores.txt over as Normal scores (it never recorded the mode).
+        if not os.path.exists(legacy_path):
+            return
+        # A damaged file or line only loses those scores; it never stops the leaderboard loading.
+        try:
+            with open(legacy_path, "r") as f:
+                lines = f.read().splitlines()
+            stamp = os.path.getmtime(legacy_path)
+        except (OSError, UnicodeDecodeError) as e:
+            print("Could not import old high scores", legacy_path, e)
+            return
+        scores = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                score = float(line)
+            except ValueError:
+                score = math.nan
+            if not math.isfinite(score):
+                print(f"Skipping unreadable high score on line {number} of {legacy_path}: {line!r}")
+                continue
+            scores.append(score)
+        for score in scores:
+            self.submit(score, "normal", None, 0.0, timestamp=stamp)
+
+    def _push(self, record):
+        heap = self._heaps[record.mode]
+        entry = (record.score, -record.timestamp, record)  # ties go to the earlier climb
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def top(self, mode):
+        # Best records for mode, highest score first.
+        return [entry[2] for entry in sorted(self._heaps[mode], reverse=True)]
+
+    def scores(self, mode=None):
+        # Top scores for mode, or across every mode when mode is None.
+        if mode is not None:
+            return [record.score for record in self.top(mode)]
+        return sorted((entry[0] for heap in self._heaps.values() for entry in heap), reverse=True)[:self.k]
+
+    def submit(self, score, mode, seed, duration, timestamp=None):
+        record = Record(score, mode, seed, time.time() if timestamp is None else timestamp, duration)
+        self._push(record)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._writes.put(record)
+        return record
+
+    def flush(self):
+        # Blocks until every submitted record is on disk.
+        self._writes.join()
+
+    def _write_loop(self):
+        while True:
+            records = [self._writes.get()]
+            while not self._writes.empty():
+                records.append(self._writes.get_nowait())
+            try:
+                self._append(records)
+                if self._count > self.compact_after:
+                    self.compact()
+            except Exception as e:
+                # Keep the thread alive: flush() at exit waits on it.
+                print("Failed to write leaderboard", self.path, e)
+            finally:
+                for _ in records:
+                    self._writes.task_done()
+
+    def _append(self, records):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) != self._valid_bytes:
+            # Not loaded yet, or changed since: find where its intact records end.
+            self._scan()
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                f.write(HEADER.pack(MAGIC, VERSION))
+            elif size > self._valid_bytes:
+                # Drop a torn record left by a crash so new records stay aligned.
+                f.truncate(self._valid_bytes)
+                f.seek(self._valid_bytes)
+            f.write(b"".join(pack_record(record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+            self._valid_bytes = f.tell()
+        self._count += len(records)
+
+    def compact(self):
+        # Rewrites the log to the best `retain` records per mode, oldest first; the old log is
+        # only replaced once the new one is completely on disk.
+        with open(self.path, "rb") as f:
+            data = f.read()
+        records = unpack_records(memoryview(data)[HEADER.size:])
+        kept = []
+        for mode in MODES:
+            kept.extend(heapq.nlargest(self.retain, (r for r in records if r.mode == mode),
+                                       key=lambda r: (r.score, -r.timestamp)))
+        kept.sort(key=lambda r: r.timestamp)
+        atomic_write(self.path, HEADER.pack(MAGIC, VERSION) + b"".join(pack_record(record) for record in kept),
+                     fsync=True)
+        self._count = len(kept)
+        self._valid_bytes = HEADER.size + len(kept) * RECORD_SIZE
@@ -1,6 +1,13 @@
 # main.py
+import argparse
+import time
 from game import Game
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="A Needed Climb")
+    parser.add_argument("--seed", type=int, help="climb the same tower every time (loaded from the chunk cache)")
+    parser.add_argument("--daily", action="store_true", help="climb today's tower")
+    args = parser.parse_args()
+    seed = int(time.strftime("%Y%m%d")) if args.daily else args.seed
+    game = Game(seed=seed)
     game.run()
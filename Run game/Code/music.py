@@ -0,0 +1,122 @@
+import json
+import os
+import queue
+import threading
+from collections import namedtuple
+import pygame
+from settings import MUSIC_DIR, CACHE_DIR
+from utils import atomic_write
+
+MUSIC_EXTENSIONS = (".mp3", ".ogg", ".wav", ".flac")
+INDEX_PATH = os.path.join(CACHE_DIR, "music_index.json")
+FADE_MS = 600
+
+# duration is in seconds, or None until it has been measured.
+Track = namedtuple("Track", "label path duration size mtime")
+
+
+def track_label(filename):
+    # "music_4.mp3" -> "Music 4"
+    return os.path.splitext(filename)[0].replace("_", " ").strip().title()
+
+
+class MusicLibrary:
+    # Tracks in MUSIC_DIR, scanned once. Durations are expensive (the file has to be decoded),
+    # so they are kept in an on-disk index keyed by (size, mtime) and only measured, in the
+    # background, for files that are new or changed.
+    def __init__(self, directory=MUSIC_DIR, index_path=INDEX_PATH):
+        self.directory = directory
+        self.index_path = index_path
+        self.tracks = []
+        self._lock = threading.Lock()
+
+    def scan(self):
+        index = self._read_index()
+        tracks = []
+        names = sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+        for name in names:
+            if not name.lower().endswith(MUSIC_EXTENSIONS):
+                continue
+            path = os.path.join(self.directory, name)
+            st = os.stat(path)
+            cached = index.get(name)
+            duration = None
+            if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime_ns:
+                duration = cached["duration"]
+            tracks.append(Track(track_label(name), path, duration, st.st_size, st.st_mtime_ns))
+        # Natural order, so "Music 10" comes after "Music 9".
+        tracks.sort(key=lambda t: [int(part) if part.isdigit() else part for part in t.label.split()])
+        self.tracks = tracks
+        if any(t.duration is None for t in tracks) or set(index) != {os.path.basename(t.path) for t in tracks}:
+            threading.Thread(target=self._measure, daemon=True).start()
+        return tracks
+
+    def _measure(self):
+        if not pygame.mixer.get_init():
+            return
+        for i, track in enumerate(list(self.tracks)):
+            if track.duration is not None:
+                continue
+            try:
+                duration = pygame.mixer.Sound(track.path).get_length()
+            except (pygame.error, OSError) as e:
+                print("Failed to read", track.path, e)
+                continue
+            with self._lock:
+                self.tracks[i] = track._replace(duration=duration)
+        self._write_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        with self._lock:
+            index = {os.path.basename(t.path): {"duration": t.duration, "size": t.size, "mtime": t.mtime}
+                     for t in self.tracks if t.duration is not None}
+        try:
+            atomic_write(self.index_path, json.dumps(index))
+        except OSError as e:
+            print("Failed to write music index", self.index_path, e)
+
+
+class MusicPlayer:
+    # Switches pygame.mixer.music tracks on a worker thread: the old track fades out and the new
+    # one is loaded and faded in there, so a menu selection returns immediately. Only the most
+    # recent request matters; ones queued behind it are dropped.
+    def __init__(self, fade_ms=FADE_MS):
+        self.fade_ms = fade_ms
+        self.current = None  # path of the requested track, or None when stopped
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(self, path):
+        self.current = path
+        self._requests.put(path)
+
+    def stop(self):
+        self.current = None
+        self._requests.put(None)
+
+    def _run(self):
+        while True:
+            path = self._requests.get()
+            while not self._requests.empty():
+                path = self._requests.get()
+            if not pygame.mixer.get_init():
+                continue
+            if pygame.mixer.music.get_busy():
+                pygame.mixer.music.fadeout(self.fade_ms)
+                pygame.time.wait(self.fade_ms)
+            if path is None:
+                pygame.mixer.music.stop()
+                continue
+            try:
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.play(-1, fade_ms=self.fade_ms)
+            except (pygame.error, OSError) as e:
+                print("Failed to load", path, e)
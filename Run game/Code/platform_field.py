@@ -0,0 +1,180 @@
+import numpy as np
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from entities import Platform, PTYPES, PTYPE_CODES, CRUMBLE_RESPAWN_MS
+from clock import REAL_CLOCK
+
+# (column, dtype) for every per-platform value held by a PlatformField.
+COLUMNS = [
+    ("x", np.int32),
+    ("y", np.int32),
+    ("w", np.int32),
+    ("h", np.int32),
+    ("original_y", np.int32),
+    ("ptype", np.int8),
+    ("is_moving", np.bool_),
+    ("moving_speed", np.int32),
+    ("is_conveyor", np.bool_),
+    ("conveyor_speed", np.int32),
+    ("is_icy", np.bool_),
+    ("is_crumble", np.bool_),
+    ("crumble_start", np.float64),  # NaN while the crumble timer is not running
+    ("crumble_duration", np.float64),
+    ("expired", np.bool_),
+]
+
+
+class PlatformView:
+    # Read-only window onto one row of a PlatformField, shaped like a Platform so the
+    # renderers and Player collision can use it. Only valid until the field is next
+    # culled or grown, since rows move.
+    def __init__(self, field, row):
+        self.field = field
+        self.row = row
+
+    @property
+    def rect(self):
+        f, i = self.field, self.row
+        return pygame.Rect(int(f.x[i]), int(f.y[i]), int(f.w[i]), int(f.h[i]))
+
+    @property
+    def original_y(self):
+        return int(self.field.original_y[self.row])
+
+    @property
+    def ptype(self):
+        return PTYPES[self.field.ptype[self.row]]
+
+    @property
+    def symbol(self):
+        return self.field.symbols[self.row]
+
+    @property
+    def is_crumble(self):
+        return bool(self.field.is_crumble[self.row])
+
+    @property
+    def expired(self):
+        return bool(self.field.expired[self.row])
+
+    draw = Platform.draw
+
+
+class PlatformField:
+    # Struct-of-arrays platform store: one NumPy column per Platform attribute, updated and
+    # culled with whole-array operations instead of one Platform.update() call per object.
+    # Rows are kept bottom-most first, like Tower.platforms.
+    def __init__(self, capacity=64, clock=None):
+        self.clock = clock or REAL_CLOCK
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.symbols = [""] * capacity
+
+    @classmethod
+    def from_platforms(cls, platforms, clock=None):
+        platforms = list(platforms)
+        field = cls(max(64, len(platforms)), clock=clock)
+        for plat in platforms:
+            field.append(plat)
+        return field
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, _ in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+        self.symbols.extend([""] * (self.capacity - len(self.symbols)))
+
+    def add(self, x, y, width, height, ptype="regular", symbol="",
+            is_moving=False, moving_speed=0,
+            is_conveyor=False, conveyor_speed=0,
+            is_icy=False, is_crumble=False, crumble_duration=None):
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.w[i] = width
+        self.h[i] = height
+        self.original_y[i] = y
+        self.ptype[i] = PTYPE_CODES[ptype]
+        self.is_moving[i] = is_moving
+        self.moving_speed[i] = moving_speed
+        self.is_conveyor[i] = is_conveyor
+        self.conveyor_speed[i] = conveyor_speed
+        self.is_icy[i] = is_icy
+        self.is_crumble[i] = is_crumble
+        self.crumble_start[i] = np.nan
+        self.crumble_duration[i] = crumble_duration if crumble_duration is not None else np.nan
+        self.expired[i] = False
+        self.symbols[i] = symbol
+        self.count += 1
+
+    def append(self, plat):
+        self.add(plat.rect.x, plat.rect.y, plat.rect.width, plat.rect.height, ptype=plat.ptype,
+                 symbol=plat.symbol, is_moving=plat.is_moving, moving_speed=plat.moving_speed,
+                 is_conveyor=plat.is_conveyor, conveyor_speed=plat.conveyor_speed,
+                 is_icy=plat.is_icy, is_crumble=plat.is_crumble, crumble_duration=plat.crumble_duration)
+        i = self.count - 1
+        self.original_y[i] = plat.original_y
+        self.expired[i] = plat.expired
+        if plat.crumble_start_time is not None:
+            self.crumble_start[i] = plat.crumble_start_time
+
+    def start_crumble(self, row):
+        if np.isnan(self.crumble_start[row]):
+            self.crumble_start[row] = self.clock.get_ticks()
+
+    def update(self):
+        # Vectorised Platform.update() over every live row.
+        n = self.count
+        x, w = self.x[:n], self.w[:n]
+        moving = self.is_moving[:n]
+        speed = self.moving_speed[:n]
+        x += np.where(moving, speed, 0).astype(x.dtype)
+        bounce = moving & ((x < 0) | (x + w > SCREEN_WIDTH))
+        speed[bounce] = -speed[bounce]
+
+        start = self.crumble_start[:n]
+        timing = self.is_crumble[:n] & ~np.isnan(start)
+        if timing.any():
+            expired = self.expired[:n]
+            elapsed = self.clock.get_ticks() - start
+            duration = self.crumble_duration[:n]
+            expire = timing & ~expired & (elapsed >= duration)
+            respawn = timing & expired & (elapsed >= duration + CRUMBLE_RESPAWN_MS)
+            expired[expire] = True
+            expired[respawn] = False
+            start[respawn] = np.nan
+
+    def cull(self, camera_offset_y):
+        # Drop every row that has scrolled too far below the camera (same rule as Tower.update).
+        n = self.count
+        keep = (self.y[:n] - camera_offset_y) < SCREEN_HEIGHT + 200
+        kept = int(keep.sum())
+        if kept == n:
+            return
+        for name, _ in COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        symbols = [s for s, k in zip(self.symbols[:n], keep) if k]
+        self.symbols[:kept] = symbols
+        self.symbols[kept:n] = [""] * (n - kept)
+        self.count = kept
+
+    def query_band(self, y0, y1):
+        # Same contract as Tower.query_band, returning views.
+        n = self.count
+        top = self.y[:n]
+        rows = np.flatnonzero((top < y1) & (top + self.h[:n] > y0))
+        return [PlatformView(self, int(i)) for i in rows]
+
+    def views(self):
+        return [PlatformView(self, i) for i in range(self.count)]
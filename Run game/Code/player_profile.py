@@ -0,0 +1,128 @@
+import atexit
+import mmap
+import os
+import struct
+import threading
+import zlib
+from settings import PLAYER_PROFILE_PATH
+from utils import atomic_write
+
+# File: one fixed-size record of (magic, version, collectibles bitset, achievements bitset,
+# total metres climbed, climbs, deaths, seconds played) followed by a CRC32 of all of it.
+RECORD = struct.Struct("<4sHIIdIId")
+CRC = struct.Struct("<I")
+MAGIC = b"CLPF"
+VERSION = 1
+WRITE_DELAY = 2.0  # seconds changes are batched before they are written
+ACHIEVEMENT_STEP_M = 500
+ACHIEVEMENTS_PER_MODE = 8
+
+
+def to_bits(indices):
+    bits = 0
+    for idx in indices:
+        bits |= 1 << idx
+    return bits
+
+
+def from_bits(bits):
+    return {idx for idx in range(bits.bit_length()) if bits >> idx & 1}
+
+
+class PlayerProfile:
+    # Collectibles, achievements and lifetime counters that survive restarts. Changes are
+    # snapshotted on the caller's thread (a few integers) and written behind by a background
+    # thread, at most once per WRITE_DELAY, so the frame loop never waits on the disk.
+    def __init__(self, path=PLAYER_PROFILE_PATH, write_delay=WRITE_DELAY):
+        self.path = path
+        self.write_delay = write_delay
+        self.collectibles = set()  # collectible_defs indices
+        self.achievements = set()  # achievement_defs indices
+        self.total_metres = 0.0
+        self.climbs = 0
+        self.deaths = 0
+        self.seconds_played = 0.0
+        self._snapshot = None
+        self._written = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._hurry = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._writer = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        # mmap refuses an empty file, so short ones are caught before mapping.
+        if os.path.getsize(self.path) < RECORD.size + CRC.size:
+            print("Ignoring truncated profile", self.path)
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            (crc,) = CRC.unpack_from(mm, RECORD.size)
+            fields = RECORD.unpack_from(mm, 0)
+            if fields[0] != MAGIC or fields[1] != VERSION or zlib.crc32(mm[:RECORD.size]) != crc:
+                print("Ignoring unreadable profile", self.path)
+                return
+        _, _, collectibles, achievements, self.total_metres, self.climbs, self.deaths, self.seconds_played = fields
+        self.collectibles.update(from_bits(collectibles))
+        self.achievements.update(from_bits(achievements))
+        self._written = self._pack()
+
+    def unlock_height_achievements(self, special_mode, height):
+        # One achievement per ACHIEVEMENT_STEP_M climbed, up to ACHIEVEMENTS_PER_MODE; Normal
+        # climbs unlock indices 0-7 and Harder climbs 8-15.
+        count = max(0, min(ACHIEVEMENTS_PER_MODE, int(height // ACHIEVEMENT_STEP_M)))
+        base = ACHIEVEMENTS_PER_MODE if special_mode else 0
+        self.achievements.update(range(base, base + count))
+
+    def record_climb(self, height, died, seconds):
+        self.total_metres += max(0.0, height)
+        self.climbs += 1
+        self.deaths += died
+        self.seconds_played += seconds
+        self.save()
+
+    def _pack(self):
+        body = RECORD.pack(MAGIC, VERSION, to_bits(self.collectibles), to_bits(self.achievements),
+                           self.total_metres, self.climbs, self.deaths, self.seconds_played)
+        return body + CRC.pack(zlib.crc32(body))
+
+    def save(self):
+        # Queues the current state to be written; returns at once.
+        data = self._pack()
+        with self._lock:
+            if data == self._written or data == self._snapshot:
+                return
+            self._snapshot = data
+            self._idle.clear()
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._wake.set()
+
+    def flush(self):
+        # Blocks until the latest saved state is on disk, cutting the batching delay short.
+        while not self._idle.wait(0.05):
+            self._hurry.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # Let further changes within write_delay fold into this write (flush() cuts it short).
+            self._hurry.wait(self.write_delay)
+            self._hurry.clear()
+            with self._lock:
+                data = self._snapshot
+                self._snapshot = None
+            if data is not None:
+                try:
+                    atomic_write(self.path, data, fsync=True)
+                    self._written = data
+                except OSError as e:
+                    print("Failed to write profile", self.path, e)
+            with self._lock:
+                if self._snapshot is None:
+                    self._idle.set()
@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+import pygame
+from settings import FPS, PROFILE_DIR, WHITE, YELLOW
+from utils import percentile
+
+# Set (to anything non-empty) to start with the profiler on; F3 toggles it in game.
+PROFILE_ENV = "CLIMB_PROFILE"
+PERCENTILES = (50, 95, 99)
+GRAPH_SIZE = (240, 60)
+GRAPH_MS = 2 * 1000 / FPS  # frame time at the top of the graph
+STATS_REFRESH = 30  # frames between redraws of the overlay's stats text
+
+
+class FrameProfiler:
+    # Per-phase frame timings taken with perf_counter_ns. A loop calls begin() at the top of a
+    # frame, mark(phase) after each phase (charging it the time since the previous mark) and
+    # end() at the bottom. While disabled every call returns straight away.
+    def __init__(self, enabled=None, window=600, trace_limit=36000):
+        if enabled is None:
+            enabled = bool(os.environ.get(PROFILE_ENV))
+        self.enabled = enabled
+        self.window = deque(maxlen=window)  # rolling frames behind the overlay's percentiles
+        self.trace = deque(maxlen=trace_limit)  # frames kept for dump()
+        self.phases = []  # every phase name seen, in first-seen order
+        self.frame_index = 0
+        self._loop = None
+        self._phases = None
+        self._start = 0
+        self._last = 0
+        self._font = None
+        self._overlay = None
+        self._overlay_age = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._phases = None
+
+    def begin(self, loop):
+        if not self.enabled:
+            return
+        self._loop = loop
+        self._phases = {}
+        self._start = self._last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        if self._phases is None:
+            return
+        now = time.perf_counter_ns()
+        self._phases[phase] = self._phases.get(phase, 0) + now - self._last
+        self._last = now
+
+    def end(self):
+        if self._phases is None:
+            return
+        for phase in self._phases:
+            if phase not in self.phases:
+                self.phases.append(phase)
+        frame = (self._loop, self.frame_index, time.perf_counter_ns() - self._start, self._phases)
+        self.window.append(frame)
+        self.trace.append(frame)
+        self.frame_index += 1
+        self._phases = None
+
+    def stats(self):
+        # {phase: {"p50", "p95", "p99", "max"}} in ms over the rolling window, plus "total".
+        columns = {"total": [frame[2] for frame in self.window]}
+        for phase in self.phases:
+            columns[phase] = [frame[3].get(phase, 0) for frame in self.window]
+        stats = {}
+        for phase, values in columns.items():
+            values = sorted(ns / 1e6 for ns in values)
+            stats[phase] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+            stats[phase]["max"] = values[-1] if values else 0.0
+        return stats
+
+    def draw(self, surface):
+        # Frame-time graph for the last GRAPH_SIZE[0] frames (yellow line = one frame at FPS)
+        # with percentile text underneath, in the top-right corner.
+        if not self.enabled or not self.window:
+            return
+        width, height = GRAPH_SIZE
+        x0 = surface.get_width() - width - 10
+        y0 = 10
+        pygame.draw.rect(surface, (0, 0, 0), (x0, y0, width, height))
+        frames = list(self.window)[-width:]
+        for i, frame in enumerate(frames):
+            bar = min(height, int(frame[2] / 1e6 / GRAPH_MS * height))
+            pygame.draw.line(surface, WHITE, (x0 + i, y0 + height), (x0 + i, y0 + height - bar))
+        budget_y = y0 + height - height // 2
+        pygame.draw.line(surface, YELLOW, (x0, budget_y), (x0 + width - 1, budget_y))
+        if self._overlay is None or self._overlay_age >= STATS_REFRESH:
+            if self._font is None:
+                self._font = pygame.font.SysFont("monospace", 12)
+            self._overlay = self._render_stats(self._font)
+            self._overlay_age = 0
+        self._overlay_age += 1
+        surface.blit(self._overlay, (x0, y0 + height + 4))
+
+    def _render_stats(self, font):
+        stats = self.stats()
+        # Total first, then the five most expensive phases by p95.
+        phases = sorted((p for p in stats if p != "total"), key=lambda p: -stats[p]["p95"])[:5]
+        lines = [f"{name:<12} {s['p50']:5.1f} {s['p95']:5.1f} {s['p99']:5.1f} {s['max']:5.1f}"
+                 for name, s in [("total", stats["total"])] + [(p, stats[p]) for p in phases]]
+        lines.insert(0, f"{'ms':<12} {'p50':>5} {'p95':>5} {'p99':>5} {'max':>5}")
+        rendered = [font.render(line, True, WHITE) for line in lines]
+        panel = pygame.Surface((max(r.get_width() for r in rendered), sum(r.get_height() for r in rendered)),
+                               pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        y = 0
+        for r in rendered:
+            panel.blit(r, (0, y))
+            y += r.get_height()
+        return panel
+
+    def dump(self, path):
+        # Writes every traced frame to path, as JSON if it ends in .json, otherwise CSV.
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".json"):
+            frames = [{"loop": loop, "frame": index, "total_ms": total / 1e6,
+                       "phases_ms": {p: ns / 1e6 for p, ns in phases.items()}}
+                      for loop, index, total, phases in self.trace]
+            with open(path, "w") as f:
+                json.dump({"phases": self.phases, "summary": self.stats(), "frames": frames}, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["loop", "frame", "total_ms"] + self.phases)
+                for loop, index, total, phases in self.trace:
+                    writer.writerow([loop, index, f"{total / 1e6:.3f}"]
+                                    + [f"{phases.get(p, 0) / 1e6:.3f}" for p in self.phases])
+        return path
+
+    def dump_all(self, directory=PROFILE_DIR):
+        # Timestamped CSV and JSON traces in directory; returns their paths.
+        stem = os.path.join(directory, time.strftime("frames_%Y%m%d_%H%M%S"))
+        return [self.dump(stem + ".csv"), self.dump(stem + ".json")]
+
+
+# Stand-in for code run without a profiler (headless simulations, batch runs).
+NULL_PROFILER = FrameProfiler(enabled=False)
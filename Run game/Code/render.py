@@ -0,0 +1,157 @@
+import pygame
+from collections import OrderedDict
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, GRAY, YELLOW, BLACK, WHITE, DARK_GRAY
+
+DIGIT_GLYPHS = "0123456789.-"
+
+PLATFORM_COLORS = {
+    "regular": GRAY,
+    "moving": (150, 150, 250),
+    "conveyor": YELLOW,
+    "icy": (180, 255, 255),
+    "slope": (0, 255, 0),
+}
+CRUMBLE_COLOR = (255, 100, 100)
+
+
+def platform_color(ptype):
+    if ptype.startswith("crumble"):
+        return CRUMBLE_COLOR
+    return PLATFORM_COLORS.get(ptype, GRAY)
+
+
+class TextCache:
+    # LRU of rendered text surfaces keyed by (font, text, antialias, colour). Menus and HUDs
+    # redraw the same strings every frame; this rasterises each one once.
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        # Same argument order as Font.render. The returned Surface is shared, so don't draw on it.
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class DigitAtlas:
+    # Pre-rendered digit glyphs for counters that change every frame (the height HUD), so a
+    # number is composed from cached glyph blits instead of rasterised each frame.
+    def __init__(self, font, color, antialias=True, glyphs=DIGIT_GLYPHS):
+        self.glyphs = {c: font.render(c, antialias, color) for c in glyphs}
+        self.height = font.get_linesize()
+
+    def width(self, text):
+        return sum(self.glyphs[c].get_width() for c in text)
+
+    def draw(self, surface, text, pos):
+        # Blits text (digits, '.' and '-' only) at pos and returns the x just past its end.
+        x, y = pos
+        glyphs = self.glyphs
+        for c in text:
+            glyph = glyphs[c]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+
+class PlatformAtlas:
+    # One pre-composed Surface per (ptype, size, symbol, font): the coloured block with its
+    # symbol already drawn on it. Every visible platform then goes out in one Surface.blits call.
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+
+    def get(self, ptype, width, height, symbol, font):
+        key = (ptype, width, height, symbol, font)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(platform_color(ptype))
+        if symbol:
+            text = text_cache.render(font, symbol, True, BLACK)
+            surface.blit(text, text.get_rect(center=(width // 2, height // 2)))
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def draw(self, surface, platforms, font, camera_offset_y):
+        batch = []
+        for plat in platforms:
+            if plat.is_crumble and plat.expired:
+                continue
+            rect = plat.rect
+            y = rect.y - camera_offset_y
+            if y >= SCREEN_HEIGHT or y + rect.height <= 0:
+                continue
+            batch.append((self.get(plat.ptype, rect.width, rect.height, plat.symbol, font), (rect.x, y)))
+        surface.blits(batch, doreturn=False)
+
+
+class SurfacePool:
+    # Solid-filled SRCALPHA surfaces keyed by (size, colour): the translucent overlays behind
+    # menus and the collectible swatches. Each is allocated and filled once, then shared.
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+
+    def filled(self, size, color):
+        # The returned Surface is shared, so don't draw on it.
+        key = (tuple(size), tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+        surface = pygame.Surface(key[0], pygame.SRCALPHA)
+        surface.fill(color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def overlay(self, color):
+        # Full-screen translucent layer, e.g. (0, 0, 0, 150) to dim whatever is underneath.
+        return self.filled((SCREEN_WIDTH, SCREEN_HEIGHT), color)
+
+
+text_cache = TextCache()
+platform_atlas = PlatformAtlas()
+surface_pool = SurfacePool()
+
+
+class GameplayRenderer:
+    # Draws one frame of a Simulation (platforms, collectibles, player, height HUD) onto a
+    # screen. Needs only a display surface and a font, so replays and benchmarks can draw
+    # climbs without building a Game.
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.hud_digits = DigitAtlas(font, WHITE)
+
+    def draw(self, sim, alpha=1.0):
+        camera_offset_y = sim.camera_offset_at(alpha)
+        self.screen.fill(DARK_GRAY)
+        platform_atlas.draw(self.screen, sim.tower.iter_platforms(), self.font, camera_offset_y)
+        for col in sim.collectibles.in_band(camera_offset_y, camera_offset_y + SCREEN_HEIGHT):
+            col.draw(self.screen, camera_offset_y)
+        sim.player.draw(self.screen, camera_offset_y, alpha)
+        # Only the number changes per frame; it is composed from pre-rendered digit glyphs.
+        label = text_cache.render(self.font, "Height: ", True, WHITE)
+        self.screen.blit(label, (10, 10))
+        x = self.hud_digits.draw(self.screen, f"{sim.score:.1f}", (10 + label.get_width(), 10))
+        self.screen.blit(text_cache.render(self.font, " m", True, WHITE), (x, 10))
@@ -0,0 +1,233 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import atexit
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from settings import FPS, PIXELS_PER_METER, REPLAY_DIR, SCREEN_WIDTH, SCREEN_HEIGHT
+from entities import PlayerInput
+from simulation import Simulation
+from utils import atomic_write
+
+# File: header, then the per-tick inputs packed two ticks per byte (one nibble each, bits
+# left/right/jump/dash) and zlib-compressed.
+HEADER = struct.Struct("<4sHBQIId")
+MAGIC = b"CLRP"
+VERSION = 1
+FLAG_HARDER = 1
+FLAG_HAS_RESULT = 2
+FLAG_DIED = 4
+# death_*.replay files kept in REPLAY_DIR; older ones are deleted as new deaths are saved.
+DEATH_REPLAYS_KEPT = 20
+
+
+def pack_input(inputs):
+    return inputs.left | inputs.right << 1 | inputs.jump << 2 | inputs.dash << 3
+
+
+def unpack_input(nibble):
+    return PlayerInput(bool(nibble & 1), bool(nibble & 2), bool(nibble & 4), bool(nibble & 8))
+
+
+class Recording:
+    # Everything needed to replay a climb exactly: the tower seed and mode, the collectibles
+    # already owned (they change which ones spawn), and the input consumed on every tick.
+    # result is (height in m, died) once the run is over.
+    def __init__(self, seed, special_mode=False, collected=(), inputs=None, result=None):
+        self.seed = seed
+        self.special_mode = special_mode
+        self.collected = frozenset(collected)
+        self.inputs = inputs if inputs is not None else []
+        self.result = result
+
+    def record(self, inputs):
+        self.inputs.append(inputs)
+
+    def finish(self, sim):
+        self.result = ((sim.start_y - sim.max_height) / PIXELS_PER_METER, sim.dead)
+
+    def save(self, path):
+        atomic_write(path, self.to_bytes())
+
+    def to_bytes(self):
+        flags = FLAG_HARDER if self.special_mode else 0
+        height = 0.0
+        if self.result is not None:
+            height, died = self.result
+            flags |= FLAG_HAS_RESULT | (FLAG_DIED if died else 0)
+        nibbles = [pack_input(inputs) for inputs in self.inputs]
+        if len(nibbles) % 2:
+            nibbles.append(0)
+        payload = bytes(lo | hi << 4 for lo, hi in zip(nibbles[::2], nibbles[1::2]))
+        collected = sum(1 << idx for idx in self.collected)
+        return (HEADER.pack(MAGIC, VERSION, flags, self.seed, collected, len(self.inputs), height)
+                + zlib.compress(payload, 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, flags, seed, collected, ticks, height = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a v{VERSION} replay: {path}")
+        payload = zlib.decompress(data[HEADER.size:])
+        table = [unpack_input(n) for n in range(16)]
+        inputs = []
+        for byte in payload:
+            inputs.append(table[byte & 15])
+            inputs.append(table[byte >> 4])
+        result = (height, bool(flags & FLAG_DIED)) if flags & FLAG_HAS_RESULT else None
+        return cls(seed, bool(flags & FLAG_HARDER), {idx for idx in range(32) if collected >> idx & 1},
+                   inputs[:ticks], result)
+
+    def simulation(self, **kwargs):
+        return Simulation(special_mode=self.special_mode, collected=set(self.collected), seed=self.seed, **kwargs)
+
+
+class ReplayWriter:
+    # Saves finished climbs from a background thread, so game over never waits on packing,
+    # compressing or writing them. Every climb becomes last.replay; deaths are also kept under
+    # their own name, newest `keep` only.
+    def __init__(self, directory=REPLAY_DIR, keep=DEATH_REPLAYS_KEPT):
+        self.directory = directory
+        self.keep = keep
+        self._writes = queue.Queue()
+        self._writer = None
+
+    def save(self, recording):
+        # recording must be finished and no longer recorded into.
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._writes.put((recording, time.strftime("%Y%m%d_%H%M%S")))
+
+    def flush(self):
+        # Blocks until every queued replay is on disk.
+        self._writes.join()
+
+    def _write_loop(self):
+        while True:
+            recording, stamp = self._writes.get()
+            try:
+                data = recording.to_bytes()
+                atomic_write(os.path.join(self.directory, "last.replay"), data)
+                if recording.result is not None and recording.result[1]:
+                    atomic_write(os.path.join(self.directory, f"death_{stamp}_{recording.seed}.replay"), data)
+                    self._prune()
+            except Exception as e:
+                print("Failed to save replay:", e)
+            finally:
+                self._writes.task_done()
+
+    def _prune(self):
+        # Names start with the timestamp, so sorting them sorts deaths oldest first.
+        deaths = sorted(name for name in os.listdir(self.directory)
+                        if name.startswith("death_") and name.endswith(".replay"))
+        for name in deaths[:max(0, len(deaths) - self.keep)]:
+            os.remove(os.path.join(self.directory, name))
+
+
+def replay(recording, sim=None, on_step=None):
+    # Feeds every recorded tick into sim (a fresh headless Simulation by default) and
+    # returns it. on_step(sim) runs after each tick, e.g. to render or throttle.
+    if sim is None:
+        sim = recording.simulation()
+    for inputs in recording.inputs:
+        sim.step(inputs)
+        if on_step is not None:
+            on_step(sim)
+        if sim.dead:
+            break
+    return sim
+
+
+def play(recording, speed=1.0):
+    # Rendered replay at speed x real time (0 = as fast as possible), drawn by the game's renderer.
+    import pygame
+    from render import GameplayRenderer
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("A Needed Climb (replay)")
+    renderer = GameplayRenderer(screen, pygame.font.SysFont(None, 36))
+    clock = pygame.time.Clock()
+    sim = recording.simulation(headless=False)
+    owed = [0.0]
+
+    def on_step(sim):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit(); sys.exit()
+        # At speed > 1 several ticks share a displayed frame (the fraction carries over, so 1.5x
+        # draws 2 of every 3 ticks); at speed < 1 every tick is drawn and frames are held longer.
+        owed[0] += 1
+        if speed and owed[0] < speed:
+            return
+        owed[0] -= max(speed, 1.0)
+        renderer.draw(sim)
+        pygame.display.flip()
+        if speed:
+            clock.tick(FPS * min(speed, 1.0))
+
+    try:
+        replay(recording, sim, on_step)
+    finally:
+        sim.close()
+    return sim
+
+
+def check(recording, sim):
+    # True if sim ended the way the recording says it should (or the recording has no result).
+    if recording.result is None:
+        return True
+    height, died = recording.result
+    return sim.dead == died and abs((sim.start_y - sim.max_height) / PIXELS_PER_METER - height) < 1e-6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded climbs headlessly or on screen.")
+    parser.add_argument("paths", nargs="*", help=f"replay files (default: every .replay in {REPLAY_DIR})")
+    parser.add_argument("--render", action="store_true", help="draw the replay (first file only)")
+    parser.add_argument("--speed", type=float, default=1.0, help="rendered speed multiplier; 0 = unthrottled")
+    args = parser.parse_args(argv)
+
+    paths = args.paths
+    if not paths and os.path.isdir(REPLAY_DIR):
+        paths = sorted(os.path.join(REPLAY_DIR, name) for name in os.listdir(REPLAY_DIR) if name.endswith(".replay"))
+    if not paths:
+        parser.error("no replays given or found")
+
+    if args.render:
+        recording = Recording.load(paths[0])
+        sim = play(recording, args.speed)
+        ok = check(recording, sim)
+        print(f"{paths[0]}: {'ok' if ok else 'MISMATCH'}")
+        return 0 if ok else 1
+
+    # Headless corpus run: every replay as fast as possible, checked against its recorded result.
+    mismatches = 0
+    total_steps = 0
+    start = time.perf_counter()
+    for path in paths:
+        recording = Recording.load(path)
+        sim = replay(recording)
+        total_steps += sim.steps
+        height = (sim.start_y - sim.max_height) / PIXELS_PER_METER
+        ok = check(recording, sim)
+        mismatches += not ok
+        print(f"{path}: {sim.steps} ticks, {height:.1f} m, {'died' if sim.dead else 'alive'}"
+              f"{'' if ok else f'  MISMATCH (recorded {recording.result})'}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} replays, {total_steps} ticks in {elapsed:.2f}s "
+          f"({total_steps / elapsed if elapsed else 0:.0f} ticks/s), {mismatches} mismatched")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
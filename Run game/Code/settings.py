@@ -4,10 +4,21 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SPRITES_DIR = os.path.join(BASE_DIR, "Sprites")
 MUSIC_DIR = os.path.join(BASE_DIR, "Music")
+DIALOG_DIR = os.path.join(BASE_DIR, "Dialog")
 HIGHSCORES_PATH = os.path.join(BASE_DIR, "highscores.txt")
+LEADERBOARD_PATH = os.path.join(BASE_DIR, "leaderboard.log")
+PLAYER_PROFILE_PATH = os.path.join(BASE_DIR, "profile.dat")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+CHUNK_CACHE_DIR = os.path.join(CACHE_DIR, "chunks")
+SPRITE_CACHE_DIR = os.path.join(CACHE_DIR, "sprites")
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+BENCHMARK_BASELINE = os.path.join(BASE_DIR, "benchmark_baseline.json")
+REPLAY_DIR = os.path.join(BASE_DIR, "replays")
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # physics steps per second
+RENDER_FPS = 144  # gameplay frame-rate cap; physics still steps at FPS
+MAX_CATCHUP_STEPS = 5  # physics steps run at most per frame after a stall
  
  # Colors
 WHITE      = (255, 255, 255)
@@ -33,4 +44,29 @@ collectible_defs = [
      ("Pink", (255, 192, 203, 200)),
      ("Brown", (165, 42, 42, 200)),
      ("Teal", (0, 128, 128, 200)),
+     ("Gold", (255, 215, 0, 200)),
+     ("Silver", (192, 192, 192, 200)),
+     ("Maroon", (128, 0, 0, 200)),
+     ("Olive", (128, 128, 0, 200)),
+     ("Turquoise", (64, 224, 208, 200)),
+ ]
+
+ # Achievement definitions for the Achievements page (4x4 grid)
+achievement_defs = [
+     ("500m Normal", (255, 200, 200, 200)),
+     ("1000m Normal", (255, 180, 180, 200)),
+     ("1500m Normal", (255, 160, 160, 200)),
+     ("2000m Normal", (255, 140, 140, 200)),
+     ("2500m Normal", (255, 120, 120, 200)),
+     ("3000m Normal", (255, 100, 100, 200)),
+     ("3500m Normal", (255, 80, 80, 200)),
+     ("4000m Normal", (255, 60, 60, 200)),
+     ("500m Hard", (200, 200, 255, 200)),
+     ("1000m Hard", (180, 180, 255, 200)),
+     ("1500m Hard", (160, 160, 255, 200)),
+     ("2000m Hard", (140, 140, 255, 200)),
+     ("2500m Hard", (120, 120, 255, 200)),
+     ("3000m Hard", (100, 100, 255, 200)),
+     ("3500m Hard", (80, 80, 255, 200)),
+     ("4000m Hard", (60, 60, 255, 200)),
  ]
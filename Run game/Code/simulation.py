@@ -0,0 +1,115 @@
+import random
+from collections import Counter
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, PIXELS_PER_METER, WHITE, collectible_defs
+from entities import Player
+from collectibles import CollectibleManager
+from clock import VirtualClock
+from profiler import NULL_PROFILER
+from world import Tower
+
+START_Y = SCREEN_HEIGHT - 50
+# Player midbottom at the start of a climb.
+SPAWN_POS = (SCREEN_WIDTH//2, START_Y - (37//2))
+# Distance (px) the player may fall below their best height before the run ends.
+DEATH_FALL_DISTANCE = 1000
+# Metres climbed between collectible spawn rolls.
+COLLECTIBLE_SPAWN_INTERVAL = 200
+
+
+class Simulation:
+    # One climb: player physics, tower generation, collectibles and death. Advances one fixed
+    # step per step() call and never touches the display, so the gameplay renderer, a bot or a
+    # headless batch run can all drive it.
+
+    def __init__(self, special_mode=False, collected=None, color=WHITE, is_bot=False, headless=True, clock=None,
+                 seed=None, chunks=None, prefetch=False, profiler=None):
+        self.start_y = START_Y
+        self.special_mode = special_mode
+        # The tower is generated from the seed itself (so a seed names a tower); the bot
+        # policy and collectible spawner get their own streams derived from it.
+        self.seed = seed
+        seeds = random.Random(seed)
+        self.rng = random.Random(seeds.getrandbits(64))
+        # Coyote time, dashes and crumble timers follow this clock, which by default
+        # advances exactly one step per step() call regardless of wall time.
+        self.clock = clock or VirtualClock()
+        # Each step() charges its phases to this profiler (a no-op unless one is passed in).
+        self.profiler = profiler or NULL_PROFILER
+        self.player = Player(*SPAWN_POS, color=color, is_bot=is_bot,
+                             headless=headless, clock=self.clock, seed=seeds.getrandbits(64))
+        self.tower = Tower(self.start_y, special_mode=special_mode, clock=self.clock, seed=seed, chunks=chunks,
+                           prefetch=prefetch)
+        # Shared with the caller so pickups land straight in the game's collection.
+        self.collected = collected if collected is not None else set()
+        self.collectibles = CollectibleManager()
+        self.last_collectible_spawn = 0
+        self.score = 0.0
+        self.max_height = self.player.rect.y
+        self.steps = 0
+        self.dead = False
+        # Landings per platform type, counting each platform once per visit.
+        self.platform_encounters = Counter()
+        self._last_landed = None
+
+    def close(self):
+        self.tower.close()
+
+    @property
+    def camera_offset_y(self):
+        return self.player.rect.y - SCREEN_HEIGHT//2
+
+    def camera_offset_at(self, alpha):
+        # Camera for a frame drawn alpha of the way from the previous step to the current one.
+        return self.player.interpolated_midbottom(alpha)[1] - self.player.height - SCREEN_HEIGHT//2
+
+    def step(self, inputs=None):
+        player = self.player
+        tower = self.tower
+        self.clock.advance()
+        player.update(tower, inputs)
+        self.profiler.mark("player")
+        self.steps += 1
+        if player.last_landed is not self._last_landed:
+            self._last_landed = player.last_landed
+            self.platform_encounters[player.last_landed.ptype] += 1
+        if player.rect.y < self.max_height:
+            self.max_height = player.rect.y
+        if player.rect.y > self.max_height + DEATH_FALL_DISTANCE:
+            self.dead = True
+        self.score = (self.start_y - player.rect.y) / PIXELS_PER_METER
+
+        self._spawn_collectibles()
+        self._pick_up_collectibles()
+        # Anything below the lowest point the player can reach alive is gone for good.
+        self.collectibles.cull(self.max_height + DEATH_FALL_DISTANCE + player.height)
+        self.profiler.mark("collectibles")
+        tower.update(self.camera_offset_y)
+        self.profiler.mark("tower")
+        self._update_slopes()
+        self.profiler.mark("slopes")
+
+    def _spawn_collectibles(self):
+        if self.score - self.last_collectible_spawn < COLLECTIBLE_SPAWN_INTERVAL:
+            return
+        self.last_collectible_spawn = self.score
+        if self.rng.random() < 1/8:
+            candidate = self.rng.randint(0, len(collectible_defs) - 1)
+            if candidate not in self.collected:
+                x = self.rng.randint(50, SCREEN_WIDTH-50)
+                y = self.camera_offset_y + self.rng.randint(50, SCREEN_HEIGHT//2)
+                self.collectibles.spawn(candidate, x, y, 20)
+
+    def _pick_up_collectibles(self):
+        for col in self.collectibles.overlapping(self.player.rect):
+            self.collected.add(col.index)
+            self.collectibles.remove(col)
+
+    def _update_slopes(self):
+        for plat in self.tower.iter_platforms():
+            if plat.ptype == "slope":
+                if self.player.rect.colliderect(plat.rect):
+                    if plat.rect.y < plat.original_y + 30:
+                        plat.rect.y += 1
+                else:
+                    if plat.rect.y > plat.original_y:
+                        plat.rect.y -= 1
@@ -0,0 +1,87 @@
+import json
+import mmap
+import os
+import struct
+import pygame
+from settings import SPRITE_CACHE_DIR
+from utils import atomic_write
+
+# File: magic, header length, JSON header (source signature, frame size, frames per state),
+# then every frame's raw RGBA pixels stacked top to bottom as one atlas.
+MAGIC = b"SPRA"
+PREFIX = struct.Struct("<4sI")
+VERSION = 1
+
+
+def _signature(paths, frame_counts, size):
+    # Changes whenever a sheet is edited or the draw size or slicing changes.
+    sources = []
+    for state, path in sorted(paths.items()):
+        st = os.stat(path)
+        sources.append([state, os.path.basename(path), st.st_mtime_ns, st.st_size, frame_counts[state]])
+    return {"version": VERSION, "size": list(size), "sources": sources}
+
+
+def cache_path(size, directory=SPRITE_CACHE_DIR):
+    return os.path.join(directory, f"sprites_{size[0]}x{size[1]}.rgba")
+
+
+def _read(path, signature):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, header_len = PREFIX.unpack_from(mm, 0)
+        if magic != MAGIC:
+            return None
+        header = json.loads(mm[PREFIX.size:PREFIX.size + header_len])
+        if header["signature"] != signature:
+            return None
+        width, height = header["signature"]["size"]
+        total = sum(count for _, count in header["states"])
+        start = PREFIX.size + header_len
+        end = start + width * height * total * 4
+        if end > len(mm):
+            return None
+        # Wrap the mapped pixels without copying; convert_alpha() makes the only copy.
+        with memoryview(mm) as view, view[start:end] as pixels:
+            raw = pygame.image.frombuffer(pixels, (width, height * total), "RGBA")
+            atlas = raw.convert_alpha()
+            del raw
+    frames = {}
+    row = 0
+    for state, count in header["states"]:
+        frames[state] = [atlas.subsurface((0, (row + i) * height, width, height)) for i in range(count)]
+        row += count
+    return frames
+
+
+def _write(path, signature, frames):
+    width, height = signature["size"]
+    states = [[state, len(state_frames)] for state, state_frames in frames.items()]
+    total = sum(count for _, count in states)
+    atlas = pygame.Surface((width, height * total), pygame.SRCALPHA)
+    row = 0
+    for state_frames in frames.values():
+        for frame in state_frames:
+            atlas.blit(frame, (0, row * height))
+            row += 1
+    header = json.dumps({"signature": signature, "states": states}).encode()
+    atomic_write(path, PREFIX.pack(MAGIC, len(header)) + header + pygame.image.tobytes(atlas, "RGBA"))
+
+
+def load_frames(paths, frame_counts, size, build, directory=SPRITE_CACHE_DIR):
+    # Sliced, scaled frames by state: read from the on-disk atlas when it matches the
+    # current sheets, otherwise built with build() and written back for next time.
+    signature = _signature(paths, frame_counts, size)
+    path = cache_path(size, directory)
+    if os.path.exists(path):
+        try:
+            frames = _read(path, signature)
+        except (OSError, ValueError, KeyError, struct.error):
+            frames = None
+        if frames is not None:
+            return frames
+    frames = build()
+    try:
+        _write(path, signature, frames)
+    except OSError as e:
+        print("Failed to write sprite cache", path, e)
+    return frames
@@ -0,0 +1,111 @@
+import numpy as np
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, PIXELS_PER_METER
+from entities import Player, GRAVITY, MAX_FALL_SPEED, COLLISION_SNAP
+from clock import VirtualClock
+from world import Tower
+from simulation import START_Y, SPAWN_POS, DEATH_FALL_DISTANCE
+
+
+class BotSwarm:
+    # N menu-demo bots climbing one shared Tower, with their state held in NumPy arrays.
+    # Each step runs the bot policy from Player.handle_input, Player.apply_gravity and the
+    # landing/ceiling resolution from Player.update for every bot at once. Bots do not
+    # collide with each other.
+    def __init__(self, n, special_mode=False, seed=None, tower=None, clock=None):
+        self.n = n
+        self.clock = clock or VirtualClock()
+        self.tower = tower or Tower(START_Y, special_mode=special_mode, clock=self.clock, seed=seed)
+        self.rng = np.random.default_rng(seed)
+
+        template = Player(*SPAWN_POS, is_bot=True, headless=True)
+        self.width = template.width
+        self.height = template.height
+        self.speed = template.speed
+        self.jump_strength = template.jump_strength
+
+        self.x = np.full(n, template.rect.x, dtype=np.int64)
+        self.y = np.full(n, template.rect.y, dtype=np.int64)
+        self.vel_x = np.zeros(n, dtype=np.int64)
+        self.vel_y = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.last_grounded_time = np.zeros(n, dtype=np.int64)
+        self.bot_timer = np.zeros(n, dtype=np.int64)
+
+        self.alive = np.ones(n, dtype=bool)
+        self.min_y = self.y.copy()
+        self.death_step = np.full(n, -1, dtype=np.int64)
+        self.steps = 0
+
+    @property
+    def max_height(self):
+        # Best height per bot, in metres.
+        return (START_Y - self.min_y) / PIXELS_PER_METER
+
+    def _policy(self, now):
+        n = self.n
+        retarget = now - self.bot_timer > self.rng.integers(1000, 3001, n)
+        directions = np.where(self.rng.random(n) < 0.5, -self.speed, self.speed)
+        self.vel_x = np.where(retarget, directions, self.vel_x)
+        self.bot_timer = np.where(retarget, now, self.bot_timer)
+        self.vel_x[self.x + self.width > SCREEN_WIDTH - 10] = -self.speed
+        self.vel_x[(self.x < 10) & (self.x + self.width <= SCREEN_WIDTH - 10)] = self.speed
+
+        jump = self.on_ground & (self.rng.random(n) < 0.03)
+        self.vel_y[jump] = self.jump_strength
+        self.on_ground[jump] = False
+        self.last_grounded_time[jump] = 0
+
+    def _physics(self, now):
+        alive = self.alive
+        self.vel_y = np.minimum(self.vel_y + GRAVITY, MAX_FALL_SPEED)
+        self.x += np.trunc(self.vel_x).astype(np.int64)
+        self.y += np.trunc(self.vel_y).astype(np.int64)
+        self.on_ground[:] = False
+
+        live_y = self.y[alive]
+        if live_y.size == 0:
+            return
+        band = self.tower.query_band(int(live_y.min()) - COLLISION_SNAP,
+                                     int(live_y.max()) + self.height + COLLISION_SNAP)
+        x, y, w, h = self.x, self.y, self.width, self.height
+        for plat in band:
+            r = plat.rect
+            hit = alive & (x < r.right) & (x + w > r.left) & (y < r.bottom) & (y + h > r.top)
+            if not hit.any():
+                continue
+            land = hit & (self.vel_y > 0) & ((y + h - r.top) < COLLISION_SNAP)
+            bonk = hit & ~land & (self.vel_y < 0) & ((r.bottom - y) < COLLISION_SNAP)
+            y[land] = r.top - h
+            self.vel_y[land] = 0
+            self.on_ground[land] = True
+            self.last_grounded_time[land] = now
+            y[bonk] = r.bottom
+            self.vel_y[bonk] = 0
+
+    def step(self):
+        self.clock.advance()
+        now = self.clock.get_ticks()
+        self._policy(now)
+        self._physics(now)
+        self.steps += 1
+
+        alive = self.alive
+        self.min_y = np.where(alive, np.minimum(self.min_y, self.y), self.min_y)
+        died = alive & (self.y > self.min_y + DEATH_FALL_DISTANCE)
+        self.death_step[died] = self.steps
+        alive &= ~died
+
+        if alive.any():
+            # Keep platforms under the lowest survivor and generate above the highest one.
+            self.tower.cull(int(self.y[alive].max()) - SCREEN_HEIGHT//2)
+            self.tower.generate_to(int(self.y[alive].min()) - SCREEN_HEIGHT//2)
+            self.tower.update_platforms()
+
+    def run(self, max_steps):
+        while self.steps < max_steps and self.alive.any():
+            self.step()
+        return self.results()
+
+    def results(self):
+        # (max height in metres, death step or None) per bot.
+        return [(float(h), int(d) if d >= 0 else None) for h, d in zip(self.max_height, self.death_step)]
@@ -1,4 +1,5 @@
 # utils.py
+import os
 import textwrap
 
 def wrap_text(text, font, max_width):
@@ -6,3 +7,22 @@ def wrap_text(text, font, max_width):
     for paragraph in text.splitlines():
         lines.extend(textwrap.wrap(paragraph, width=40))
     return lines
+
+def atomic_write(path, data, fsync=False):
+    # Writes data (bytes or str) to a temp file beside path and renames it over path, so readers
+    # see the old file or the new one, never half of it. fsync=True also waits for the disk.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w" if isinstance(data, str) else "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an ascending list; 0.0 when it is empty.
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -1,37 +1,113 @@
 import pygame
 import random
+import queue
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import islice
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, PIXELS_PER_METER
 
-from entities import Platform  # Make sure this import exists if using world.py
+from entities import Platform, PTYPES  # Make sure this import exists if using world.py
+from clock import REAL_CLOCK
+
+# Slope platforms sag up to this many pixels below their original_y.
+SLOPE_SAG = 30
+# Platforms a prefetching tower keeps built ahead of the camera: gaps average ~85px,
+# so this is about five screens.
+PREFETCH_DEPTH = 36
+# Culled platforms are only dropped from the front of Tower's lists once at least this many
+# have piled up there (and they outnumber the live ones).
+COMPACT_AFTER = 64
+
+
+class PlatformPrefetcher:
+    # Producer thread that keeps a bounded queue of ready platforms, so the frame loop only
+    # pops them instead of generating a burst inside one frame.
+    def __init__(self, produce, depth=PREFETCH_DEPTH):
+        self.ready = queue.Queue(maxsize=depth)
+        self._produce = produce
+        self._error = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tower-prefetch", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                plat = self._produce()
+            except Exception as e:
+                # Handed to the frame loop by get() once the platforms before it run out.
+                self._error = e
+                return
+            while not self._stopped.is_set():
+                try:
+                    self.ready.put(plat, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self):
+        # Blocks only if the producer has fallen behind; re-raises whatever stopped it.
+        while True:
+            try:
+                return self.ready.get(timeout=0.1)
+            except queue.Empty:
+                if self._error is not None:
+                    raise self._error
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
 
 class Tower:
-    def __init__(self, start_y, special_mode=False):
-        self.platforms = []
+    def __init__(self, start_y, special_mode=False, clock=None, seed=None, chunks=None, prefetch=False):
+        self.clock = clock or REAL_CLOCK
+        # The same seed and mode always produce the same tower.
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # With a ChunkCache, platforms are read from pregenerated chunks (identical to what
+        # generate_next_platform would produce for this seed) instead of generated here.
+        if chunks is not None:
+            if seed is None:
+                raise ValueError("a chunked tower needs a seed")
+            self._chunk_records = chunks.iter_records(seed, special_mode)
+        else:
+            self._chunk_records = None
+        # Bottom-most platform first, newest (highest) last. Culling only moves _head past the
+        # culled platforms, so both lists keep O(1) indexing for query_band's bisect; the dead
+        # prefix is deleted in one go once it outgrows the live part.
+        self._platforms = []
+        # -original_y of each platform, parallel to self._platforms. Platforms are generated
+        # strictly upwards, so this stays sorted ascending and can be bisected.
+        self._platform_keys = []
+        self._head = 0
+        self.top_platform = None
+        self._max_platform_height = 0
         self.start_y = start_y
         self.highest_platform_y = start_y
         self.special_mode = special_mode
+        self._prefetcher = None
         self.generate_initial_platforms()
+        # From here on the producer thread is the only user of self.rng and the chunk
+        # records, so the platform sequence is the same as without prefetching.
+        if prefetch:
+            self._prefetcher = PlatformPrefetcher(self._make_producer())
     # ... rest of Tower class ...
 
 
     def generate_initial_platforms(self):
         # Create the ground
-        ground = Platform(0, self.start_y, SCREEN_WIDTH, 40, ptype="regular")
-        self.platforms.append(ground)
+        ground = Platform(0, self.start_y, SCREEN_WIDTH, 40, ptype="regular", clock=self.clock)
+        self.add_platform(ground)
         self.highest_platform_y = self.start_y
 
-        last_center_x = SCREEN_WIDTH // 2
-        last_y = self.start_y
-
-        while last_y > self.start_y - SCREEN_HEIGHT * 2:
-            new_plat = self.generate_next_platform(last_center_x, last_y)
-            self.platforms.append(new_plat)
-            last_center_x = new_plat.rect.x + new_plat.rect.width // 2
-            last_y = new_plat.rect.y
+        while self.highest_platform_y > self.start_y - SCREEN_HEIGHT * 2:
+            new_plat = self.next_platform()
+            self.add_platform(new_plat)
             self.highest_platform_y = new_plat.rect.y
 
     def generate_next_platform(self, prev_center_x, prev_y):
-        gap = random.randint(60, 110)
+        gap = self.rng.randint(60, 110)
         new_y = prev_y - gap
         diff = self.start_y - new_y
         diff_meters = diff / PIXELS_PER_METER
@@ -40,7 +116,7 @@ class Tower:
         min_width = 50  # Adjusted to prevent unfair jumps
         width = max(min_width, base_width - ((diff - (500 * PIXELS_PER_METER)) // 50))
 
-        offset = random.randint(-150, 150)
+        offset = self.rng.randint(-150, 150)
         center_x = prev_center_x + offset
         center_x = max(width // 2, min(SCREEN_WIDTH - width // 2, center_x))
         new_x = center_x - width // 2
@@ -49,9 +125,9 @@ class Tower:
         if diff_meters < 500:
             ptype = "regular"
         elif diff_meters < 1000:
-            ptype = "moving" if random.random() < 0.1 else "regular"
+            ptype = "moving" if self.rng.random() < 0.1 else "regular"
         elif diff_meters < 1500:
-            r = random.random()
+            r = self.rng.random()
             if r < 0.1:
                 ptype = "moving"
             elif r < 0.2:
@@ -59,7 +135,7 @@ class Tower:
             else:
                 ptype = "regular"
         elif diff_meters < 2000:
-            r = random.random()
+            r = self.rng.random()
             if r < 0.15:
                 ptype = "moving"
             elif r < 0.30:
@@ -69,7 +145,7 @@ class Tower:
             else:
                 ptype = "regular"
         elif diff_meters < 2500:
-            r = random.random()
+            r = self.rng.random()
             if r < 0.15:
                 ptype = "moving"
             elif r < 0.30:
@@ -81,24 +157,90 @@ class Tower:
             else:
                 ptype = "regular"
         else:
-            if random.random() < 0.2:
+            if self.rng.random() < 0.2:
                 ptype = "regular"
             else:
-                ptype = random.choice(["moving", "conveyor", "icy", "crumble_3", "crumble_1"])
+                ptype = self.rng.choice(["moving", "conveyor", "icy", "crumble_3", "crumble_1"])
 
-        return Platform(new_x, new_y, width, height, ptype=ptype)
+        return Platform(new_x, new_y, width, height, ptype=ptype, clock=self.clock)
 
-    def update(self, camera_offset_y):
+    def next_platform(self):
+        # The platform above top_platform: prefetched, read from the chunk cache or freshly generated.
+        if self._prefetcher is not None:
+            return self._prefetcher.get()
+        return self._platform_after(self.top_platform)
+
+    def _platform_after(self, prev):
+        if self._chunk_records is not None:
+            x, dy, width, height, ptype = next(self._chunk_records)
+            return Platform(x, self.start_y - dy, width, height, ptype=PTYPES[ptype], clock=self.clock)
+        return self.generate_next_platform(prev.rect.x + prev.rect.width // 2, prev.rect.y)
+
+    def _make_producer(self):
+        prev = self.top_platform
+
+        def produce():
+            nonlocal prev
+            prev = self._platform_after(prev)
+            return prev
+        return produce
+
+    def close(self):
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    @property
+    def platforms(self):
+        # Snapshot of the live platforms, bottom-most first; per-step code uses iter_platforms().
+        return self._platforms[self._head:]
+
+    def iter_platforms(self):
+        # The live platforms, bottom-most first, without copying them. Don't add or cull while
+        # iterating.
+        return islice(self._platforms, self._head, None)
+
+    def add_platform(self, plat):
+        self._platforms.append(plat)
+        self._platform_keys.append(-plat.original_y)
+        self.top_platform = plat
+        self._max_platform_height = max(self._max_platform_height, plat.rect.height)
+
+    def query_band(self, y0, y1):
+        # Platforms whose rect overlaps the rows y0 <= y < y1, bottom-most first
+        # (the same order as self.platforms).
+        keys = self._platform_keys
+        start = bisect_right(keys, -y1, lo=self._head)
+        end = bisect_left(keys, self._max_platform_height + SLOPE_SAG - y0, lo=start)
+        platforms = self._platforms
+        return [platforms[i] for i in range(start, end)
+                if platforms[i].rect.top < y1 and platforms[i].rect.bottom > y0]
+
+    def cull(self, camera_offset_y):
         # Remove platforms too far below
-        self.platforms = [p for p in self.platforms if p.rect.y - camera_offset_y < SCREEN_HEIGHT + 200]
+        platforms = self._platforms
+        head = self._head
+        while head < len(platforms) and platforms[head].rect.y - camera_offset_y >= SCREEN_HEIGHT + 200:
+            head += 1
+        if head >= COMPACT_AFTER and head * 2 >= len(platforms):
+            del platforms[:head]
+            del self._platform_keys[:head]
+            head = 0
+        self._head = head
 
+    def generate_to(self, camera_offset_y):
         # Generate new platforms
         while self.highest_platform_y > camera_offset_y - 100:
-            highest = min(self.platforms, key=lambda p: p.rect.y)
-            new_plat = self.generate_next_platform(highest.rect.x + highest.rect.width // 2, highest.rect.y)
-            self.platforms.append(new_plat)
+            new_plat = self.next_platform()
+            self.add_platform(new_plat)
             self.highest_platform_y = new_plat.rect.y
 
+    def update_platforms(self):
         # Update platforms (like moving platforms)
-        for plat in self.platforms:
+        for plat in self.iter_platforms():
             plat.update()
+
+    def update(self, camera_offset_y):
+        self.cull(camera_offset_y)
+        self.generate_to(camera_offset_y)
+        self.update_platforms()